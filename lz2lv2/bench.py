@@ -0,0 +1,318 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Created on Mon 2026-10-19 08:29:36 BRT
+# License is GPLv3, see COPYING.txt for more details.
+# @author: Danilo de Jesus da Silva Bellini
+"""
+lz2lv2 benchmark suite module (requires NumPy), run it with
+``python -m lz2lv2.bench``.
+"""
+
+from __future__ import division, print_function
+
+from collections import OrderedDict
+import os, shutil, tempfile
+from .core import run_source
+from .build import build_bundle
+from .chain import build_chain
+from .host import Plugin, PluginChain, benchmark
+from .cost import estimate_cost
+
+
+bench_template = "\n".join([
+  "class Metadata:",
+  "  name = 'Bench'",
+  "  uri = 'http://lz2lv2.bench/{name}'",
+  "  channels = {channels}",
+  "process = {process}",
+])
+
+
+def build_source(src, work_dir, name, rate=None, engine=None):
+  """
+  Build a plugin from the given Python plugin source string in a ``name``
+  bundle inside the ``work_dir`` directory, returning the shared object
+  file name.
+  """
+  fname = os.path.join(work_dir, name + ".py")
+  with open(fname, "w") as f:
+    f.write(src)
+  return build_bundle(fname, os.path.join(work_dir, name + ".lv2"),
+                      rate=rate, engine=engine)
+
+
+def bench_channels(process="1 / (1 - .3 * z ** -3)", channels=(2, 4, 8),
+                   rate=44100, block_size=256, **kwargs):
+  """
+  Compare N mono instances against a single N-channel instance of a plugin
+  with the same ``process`` (a source code string), for each N in
+  ``channels``.
+
+  Returns
+  -------
+  List of dictionaries (one per N) with the engine of the N-channel
+  instance, the time in ns per frame (i.e., per sample in every channel)
+  for both cases and the speedup. Extra keyword arguments are sent to
+  ``benchmark``.
+  """
+  work_dir = tempfile.mkdtemp()
+  try:
+    mono_so = build_source(bench_template.format(name="mono", channels=1,
+                                                 process=process),
+                           work_dir, "mono", rate=rate)
+    results = []
+    for nch in channels:
+      name = "ch{}".format(nch)
+      src = bench_template.format(name=name, channels=nch, process=process)
+      multi_so = build_source(src, work_dir, name, rate=rate)
+      engine = estimate_cost(run_source(src, name, rate=rate))["engine"]
+      mono_ns = 0.
+      for unused in range(nch):
+        with Plugin(mono_so, rate=rate, block_size=block_size) as plugin:
+          mono_ns += benchmark(plugin, **kwargs)["ns_per_sample"]
+      with Plugin(multi_so, rate=rate, inputs=nch, outputs=nch,
+                  block_size=block_size) as plugin:
+        multi_ns = benchmark(plugin, **kwargs)["ns_per_sample"]
+      results.append(OrderedDict([
+        ("channels", nch),
+        ("engine", engine),
+        ("mono_ns_per_frame", mono_ns),
+        ("multi_ns_per_frame", multi_ns),
+        ("speedup", mono_ns / multi_ns),
+      ]))
+    return results
+  finally:
+    shutil.rmtree(work_dir)
+
+
+def bench_fir(taps=(8, 16, 32, 64, 128, 256, 512), engines=("dfi", "fir"),
+              block_size=256, **kwargs):
+  """
+  Throughput of FIR filters by tap count for each engine (see ``ns2c``),
+  where ``dfi`` is the scalar per-sample loop and ``fir`` is the vectorized
+  block kernel.
+
+  Returns
+  -------
+  List of dictionaries (one per tap count) with the time in ns per sample
+  for each engine. Extra keyword arguments are sent to ``benchmark``.
+  """
+  work_dir = tempfile.mkdtemp()
+  try:
+    results = []
+    for ntaps in taps:
+      process = "ZFilter([1 / (k + 1) for k in range({})])".format(ntaps)
+      row = OrderedDict([("taps", ntaps)])
+      for engine in engines:
+        name = "fir{}{}".format(ntaps, engine)
+        so_fname = build_source(bench_template.format(name=name, channels=1,
+                                                      process=process),
+                                work_dir, name, engine=engine)
+        with Plugin(so_fname, block_size=block_size) as plugin:
+          row[engine + "_ns"] = benchmark(plugin, **kwargs)["ns_per_sample"]
+      results.append(row)
+    return results
+  finally:
+    shutil.rmtree(work_dir)
+
+
+# Source code for ``bench_multirate``, with the ``design`` of the ``inner``
+# process for the plugin rate ("full") or for the lower internal rate
+multirate_templates = {
+  "full": "{design}\n" + bench_template.format(name="{name}", channels=1,
+                                               process="inner"),
+  "multirate": "with decimated({factor}) as stage:\n{design}\n" +
+               bench_template.format(name="{name}", channels=1,
+                                     process="stage(inner)"),
+}
+
+# Default design for ``bench_multirate``, an envelope follower
+envelope_design = "\n".join([
+  "smooth = lowpass(20 * Hz)",
+  "inner = lambda sig: smooth(abs(sig)).map(sqrt).map(tanh)",
+])
+
+
+def bench_multirate(design=envelope_design, factors=(2, 4, 8), rate=44100,
+                    block_size=256, **kwargs):
+  """
+  Compare a process running at the plugin rate against the same process
+  designed for and running at a lower internal rate (see the ``multirate``
+  module), for each decimation factor in ``factors``. The ``design`` is the
+  source code that assigns the process to ``inner``.
+
+  Returns
+  -------
+  List of dictionaries (one per factor) with the time in ns per sample for
+  both cases and the speedup. Extra keyword arguments are sent to
+  ``benchmark``.
+  """
+  work_dir = tempfile.mkdtemp()
+  try:
+    full_so = build_source(multirate_templates["full"].format(
+      name="full", design=design,
+    ), work_dir, "full", rate=rate)
+    with Plugin(full_so, rate=rate, block_size=block_size) as plugin:
+      full_ns = benchmark(plugin, **kwargs)["ns_per_sample"]
+    results = []
+    for factor in factors:
+      name = "multirate{}".format(factor)
+      so_fname = build_source(multirate_templates["multirate"].format(
+        name=name, factor=factor,
+        design="\n".join("  " + line for line in design.splitlines()),
+      ), work_dir, name, rate=rate)
+      with Plugin(so_fname, rate=rate, block_size=block_size) as plugin:
+        multirate_ns = benchmark(plugin, **kwargs)["ns_per_sample"]
+      results.append(OrderedDict([
+        ("factor", factor),
+        ("full_ns", full_ns),
+        ("multirate_ns", multirate_ns),
+        ("speedup", full_ns / multirate_ns),
+      ]))
+    return results
+  finally:
+    shutil.rmtree(work_dir)
+
+
+# Default chains for ``bench_chain``, linear (multiplied in a single
+# filter) and with a non-linear stage (traced)
+bench_chains = OrderedDict([
+  ("linear", ["lowpass(5 * kHz)", "highpass(80 * Hz)",
+              "resonator(440 * Hz, 100 * Hz)", "1 - .5 * z ** -1"]),
+  ("traced", ["lowpass(5 * kHz)", "highpass(80 * Hz)",
+              "lambda sig: sig.map(tanh)", "resonator(440 * Hz, 100 * Hz)"]),
+])
+
+
+def bench_chain(stages, rate=44100, block_size=256, **kwargs):
+  """
+  Compare a chain of plugins (the ``stages`` list of ``process`` source
+  code strings) running as separate instances in series against the same
+  chain fused in a single plugin (see ``chain.build_chain``).
+
+  Returns
+  -------
+  Dictionary with the number of stages, the time in ns per sample for both
+  cases and the speedup. Extra keyword arguments are sent to ``benchmark``.
+  """
+  work_dir = tempfile.mkdtemp()
+  try:
+    so_fnames, fnames = [], []
+    for idx, process in enumerate(stages):
+      name = "stage{}".format(idx)
+      so_fnames.append(build_source(bench_template.format(
+        name=name, channels=1, process=process,
+      ), work_dir, name, rate=rate))
+      fnames.append(os.path.join(work_dir, name + ".py"))
+    fused_so = build_chain(fnames, os.path.join(work_dir, "fused.lv2"),
+                           rate=rate)
+    with PluginChain(Plugin(so_fname, rate=rate, block_size=block_size)
+                     for so_fname in so_fnames) as plugin:
+      separate_ns = benchmark(plugin, **kwargs)["ns_per_sample"]
+    with Plugin(fused_so, rate=rate, block_size=block_size) as plugin:
+      fused_ns = benchmark(plugin, **kwargs)["ns_per_sample"]
+    return OrderedDict([
+      ("stages", len(stages)),
+      ("separate_ns", separate_ns),
+      ("fused_ns", fused_ns),
+      ("speedup", separate_ns / fused_ns),
+    ])
+  finally:
+    shutil.rmtree(work_dir)
+
+
+# Processes for each kernel used by ``calibrate``, with distinct costs
+calibration_processes = OrderedDict([
+  ("dfi", ["ZFilter([1 / (k + 1) for k in range({0})], "
+           "[1] + [.5 / {0}] * {0})".format(n) for n in [2, 8, 32]]),
+  ("fir", ["ZFilter([1 / (k + 1) for k in range({})])".format(n)
+           for n in [16, 64, 256]]),
+  ("sparse", ["ZFilter([1 / (k + 1) if k % 8 == 0 else 0 "
+              "for k in range({})])".format(n) for n in [16, 64, 256]]),
+  ("trace", ["lambda sig: .5 * sig",
+             "lambda sig: sig.map(tanh)",
+             "lambda sig: sig.map(tanh).map(sin).map(atan) / (2 + sig)"]),
+  ("multirate", ["decimated(8)(lambda sig: .5 * sig)",
+                 "decimated(4)(lambda sig: sig.map(tanh))",
+                 "decimated(2)(lambda sig: sig.map(tanh).map(sin).map(atan) "
+                 "/ (2 + sig))"]),
+])
+
+
+def calibrate(block_size=256, **kwargs):
+  """
+  Measure the calibration for the static cost estimate (see the ``cost``
+  module), fitting a line (least squares) to the time in ns per sample as
+  a function of the estimated ``ops`` of some processes for each kernel.
+  When the fitted base would be negative, the line is fitted through the
+  origin instead.
+
+  Returns
+  -------
+  Dictionary with a ``(base, slope)`` pair for each kernel, like
+  ``cost.default_calibration``. Extra keyword arguments are sent to
+  ``benchmark``.
+  """
+  work_dir = tempfile.mkdtemp()
+  try:
+    calibration = OrderedDict()
+    for kernel, processes in calibration_processes.items():
+      engine = None if kernel in ["trace", "multirate"] else kernel
+      points = []
+      for idx, process in enumerate(processes):
+        name = "cal{}{}".format(kernel, idx)
+        src = bench_template.format(name=name, channels=1, process=process)
+        so_fname = build_source(src, work_dir, name, engine=engine)
+        with Plugin(so_fname, block_size=block_size) as plugin:
+          ns_per_sample = benchmark(plugin, **kwargs)["ns_per_sample"]
+        ops = estimate_cost(run_source(src, name), engine=engine)["ops"]
+        points.append((ops, ns_per_sample))
+      ops_mean = sum(ops for ops, ns in points) / len(points)
+      ns_mean = sum(ns for ops, ns in points) / len(points)
+      slope = max(sum((ops - ops_mean) * (ns - ns_mean)
+                      for ops, ns in points) /
+                  sum((ops - ops_mean) ** 2 for ops, ns in points), 0.)
+      base = ns_mean - slope * ops_mean
+      if base < 0:
+        base, slope = 0., (sum(ops * ns for ops, ns in points) /
+                           sum(ops ** 2 for ops, ns in points))
+      calibration[kernel] = (base, slope)
+    return calibration
+  finally:
+    shutil.rmtree(work_dir)
+
+
+def print_table(title, rows):
+  """ Print a list of dictionaries with the same keys as a table. """
+  print(title)
+  if not rows:
+    return
+  keys = list(rows[0])
+  sizes = [max(len(key), 10) for key in keys]
+  print("  ".join(key.rjust(size) for key, size in zip(keys, sizes)))
+  for row in rows:
+    print("  ".join(("{:.3f}" if isinstance(row[key], float) else "{}")
+                    .format(row[key]).rjust(size)
+                    for key, size in zip(keys, sizes)))
+  print()
+
+
+def main():
+  print_table("N mono instances vs. one N-channel instance",
+              bench_channels())
+  print_table("FIR throughput (ns/sample) by tap count and engine",
+              bench_fir())
+  print_table("Separate plugins in series vs. a fused chain (ns/sample)",
+              [OrderedDict([("chain", name)] +
+                           list(bench_chain(stages).items()))
+               for name, stages in bench_chains.items()])
+  print_table("Full rate vs. multirate (ns/sample) by decimation factor",
+              bench_multirate())
+  print_table("Cost estimate calibration (ns/sample = base + slope * ops)",
+              [OrderedDict([("kernel", kernel), ("base", base),
+                            ("slope", slope)])
+               for kernel, (base, slope) in calibrate().items()])
+
+
+if __name__ == "__main__":
+  main()
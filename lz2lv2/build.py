@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Created on Mon 2026-10-19 08:28:10 BRT
+# License is GPLv3, see COPYING.txt for more details.
+# @author: Danilo de Jesus da Silva Bellini
+"""
+lz2lv2 plugin building (compiling) module.
+"""
+
+import os, subprocess, logging
+from .core import run_source, ns2model, metadata2ttl
+from .codegen import ns2c, ns2kernel, coeff_tolerance
+from .cost import estimate_cost, check_budget
+
+
+logger = logging.getLogger(__name__)
+
+
+default_cc = os.environ.get("CC", "cc")
+default_cflags = ["-O3", "-fPIC", "-shared", "-fvisibility=hidden"]
+default_libs = ["-lm"]
+
+
+def find_compiler(cc=None):
+  """
+  Full path of the C compiler executable (defaults to ``default_cc``), or
+  None when it's not in the ``PATH``.
+  """
+  try:
+    from shutil import which
+  except ImportError: # Python 2
+    from distutils.spawn import find_executable as which
+  return which(cc or default_cc)
+
+
+def compile_plugin(c_code, so_fname, cc=None, cflags=None):
+  """
+  Compile the given C source code string to a shared object. The C source is
+  also stored, with the same name of the shared object but a ``.c``
+  extension.
+
+  Parameters
+  ----------
+  c_code :
+    String with the C source code.
+  so_fname :
+    Output shared object file name.
+  cc :
+    C compiler executable. Defaults to the ``CC`` environment variable, or
+    ``cc`` when it's not available.
+  cflags :
+    List of compiler flags, defaults to ``default_cflags``.
+  """
+  c_fname = os.path.splitext(so_fname)[0] + ".c"
+  with open(c_fname, "w") as f:
+    f.write(c_code)
+  cmd = [cc or default_cc] + list(default_cflags if cflags is None
+                                  else cflags)
+  subprocess.check_call(cmd + ["-o", so_fname, c_fname] + default_libs)
+  return so_fname
+
+
+def build_bundle(fname, bundle_dir, rate=None, **kwargs):
+  """
+  Build a LV2 bundle directory with a ``manifest.ttl`` and the compiled
+  plugin from a Python plugin source file.
+
+  Parameters
+  ----------
+  fname :
+    A string with the filename for a Python source that contains a plugin.
+  bundle_dir :
+    Output directory, created when needed.
+  rate :
+    Sample rate seen by the plugin source (see ``ns2c``), defaults to None.
+
+  Returns
+  -------
+  The shared object file name. Extra keyword arguments are sent to
+  ``build_ns``.
+  """
+  with open(fname, "r") as f:
+    fdata = f.read()
+  ns = run_source(fdata, fname, rate=rate or 1)
+  return build_ns(ns, bundle_dir, rate=rate, **kwargs)
+
+
+def build_ns(ns, bundle_dir, rate=None, engine=None,
+             tolerance=coeff_tolerance, budget=None, calibration=None,
+             ttl_cost=False, **kwargs):
+  """
+  Build a LV2 bundle directory with a ``manifest.ttl`` and the compiled
+  plugin from a Python Namespace (with a ``Metadata`` class and a
+  ``process``), as returned by ``run_source``.
+
+  Parameters
+  ----------
+  ns :
+    The plugin namespace.
+  bundle_dir :
+    Output directory, created when needed.
+  rate :
+    Sample rate seen by the plugin source (see ``ns2c``), defaults to None.
+  engine :
+    Code generation engine name (see ``ns2c``), defaults to None.
+  tolerance :
+    Filter simplification tolerance (see ``ns2c``), defaults to
+    ``coeff_tolerance``. None means no simplification.
+  budget :
+    Maximum estimated cost in ns per sample (see ``cost.estimate_cost``),
+    the build fails with a ``BudgetError`` when it's exceeded. Defaults to
+    None, meaning there's no budget.
+  calibration :
+    Calibration for the cost estimate, defaults to
+    ``cost.default_calibration``.
+  ttl_cost :
+    Boolean to choose whether the cost estimate should be stored in the
+    ``manifest.ttl``, defaults to False.
+
+  Returns
+  -------
+  The shared object file name. Extra keyword arguments are sent to
+  ``compile_plugin``.
+  """
+  model = ns2model(ns)
+  kernel = ns2kernel(ns, engine=engine, tolerance=tolerance)
+  cost = estimate_cost(ns, calibration=calibration, kernel=kernel)
+  logger.info("%s: %s engine, %g ops, estimated %.3f ns/sample",
+              model.uri, cost["engine"], cost["ops"], cost["ns_per_sample"])
+  check_budget(cost, budget)
+  if not os.path.isdir(bundle_dir):
+    os.makedirs(bundle_dir)
+  with open(os.path.join(bundle_dir, "manifest.ttl"), "w") as f:
+    f.write(metadata2ttl(model, cost=cost["ns_per_sample"] if ttl_cost
+                                     else None))
+  so_fname = os.path.join(bundle_dir, model.binary)
+  return compile_plugin(ns2c(ns, rate=rate, kernel=kernel), so_fname,
+                        **kwargs)
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Created on Mon 2026-10-19 08:48:40 BRT
+# License is GPLv3, see COPYING.txt for more details.
+# @author: Danilo de Jesus da Silva Bellini
+"""
+lz2lv2 fused plugin chains.
+
+Several plugins in series are built as a single plugin, whose ``process``
+is the composition of the ``process`` of every plugin in the chain. The
+multirate plugins (see the ``multirate`` module) can't be chained, as a
+multirate stage can't be traced inside another process.
+"""
+
+from functools import reduce
+import operator, os
+from audiolazy import LinearFilter
+from .core import run_source
+from .multirate import Multirate
+from .codegen import linear_coeffs
+from .build import build_ns
+
+
+# Maximum denominator order for multiplying the linear filters in a chain,
+# as the high order direct form implementations are numerically worse than
+# cascading the filters (done by tracing the composition)
+chain_max_order = 8
+
+
+def chain_process(processes):
+  """
+  Compose the given ``process`` objects (in the processing order). Linear
+  filters are multiplied in a single linear filter when the result order
+  allows, otherwise the result is a function that applies each stage, which
+  can be traced to a single fused loop (see the ``trace`` module).
+  """
+  processes = list(processes)
+  if all(isinstance(process, LinearFilter) for process in processes):
+    order = sum(len(linear_coeffs(process)[1]) - 1 for process in processes)
+    if order <= chain_max_order:
+      return reduce(operator.mul, processes)
+  def process(sig):
+    for stage in processes:
+      sig = stage(sig)
+    return sig
+  return process
+
+
+def chain_metadata(nss, name=None, uri=None):
+  """
+  ``Metadata`` class for a chain of plugins (namespaces), with the
+  attributes from the first plugin that has them, besides the ``name`` and
+  ``uri``, which default to the joined names and the first URI with a
+  ``-chain`` suffix, and the LV2 classes from every plugin. All the plugins
+  should have the same number of channels.
+  """
+  mdicts = [vars(ns["Metadata"]) for ns in nss]
+  channels = set(mdict.get("channels", 1) for mdict in mdicts)
+  if len(channels) != 1:
+    raise ValueError("Can't chain plugins with distinct channel counts: {}"
+                     .format(sorted(channels)))
+  attrs, lv2classes = {}, []
+  for mdict in mdicts:
+    for key, value in mdict.items():
+      if not key.startswith("__"):
+        attrs.setdefault(key, value)
+    classes = mdict.get("lv2class", [])
+    for cls in classes if isinstance(classes, (tuple, list)) else [classes]:
+      if cls not in lv2classes:
+        lv2classes.append(cls)
+  attrs["lv2class"] = lv2classes
+  attrs["name"] = name or " > ".join(mdict["name"] for mdict in mdicts)
+  attrs["uri"] = uri or mdicts[0]["uri"] + "-chain"
+  return type("Metadata", (object,), attrs)
+
+
+def chain_ns(nss, fname, name=None, uri=None):
+  """
+  Python Namespace for a chain of plugins (namespaces, in the processing
+  order), as if it was run from a ``fname`` plugin source file (which
+  defines the shared object file name), with a merged ``Metadata`` (see
+  ``chain_metadata``) and a composed ``process`` (see ``chain_process``).
+  Raises a ValueError for multirate plugins.
+  """
+  for ns in nss:
+    if isinstance(ns["process"], Multirate):
+      raise ValueError("Can't chain the multirate plugin {}"
+                       .format(ns["__file__"]))
+  docs = [ns["__doc__"].strip() for ns in nss if ns.get("__doc__")]
+  return {
+    "__file__": fname,
+    "__doc__": "\n\n".join(docs) or None,
+    "Metadata": chain_metadata(nss, name=name, uri=uri),
+    "process": chain_process(ns["process"] for ns in nss),
+  }
+
+
+def build_chain(fnames, bundle_dir, rate=None, name=None, uri=None,
+                **kwargs):
+  """
+  Build a single LV2 bundle with the plugin sources in the ``fnames`` list
+  fused in series, in that order. The shared object is named after the
+  bundle directory, and the ``name`` and ``uri`` are the chain ones (see
+  ``chain_metadata``).
+
+  Returns
+  -------
+  The shared object file name. Extra keyword arguments are sent to
+  ``build_ns``. A multirate plugin is rejected before building anything,
+  with a ValueError naming its file.
+  """
+  nss = []
+  for fname in fnames:
+    with open(fname, "r") as f:
+      nss.append(run_source(f.read(), fname, rate=rate or 1))
+  chain_fname = os.path.splitext(os.path.normpath(bundle_dir))[0] + ".py"
+  return build_ns(chain_ns(nss, chain_fname, name=name, uri=uri),
+                  bundle_dir, rate=rate, **kwargs)
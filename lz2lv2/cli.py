@@ -7,8 +7,10 @@
 lz2lv2 Command Line Interface module.
 """
 
-import sys, os
+import sys, os, logging
 from .core import run_source, ns2metadata, metadata2ttl
+from .build import build_bundle
+from .chain import build_chain
 
 
 def build_manifest_ttl_data(fname):
@@ -33,11 +35,38 @@ def build_manifest_ttl_data(fname):
 
 def main():
   # A simple interface written mainly for trying.
-  if len(sys.argv) < 3 or sys.argv[1] != "ttl":
+  if len(sys.argv) < 3 or \
+     sys.argv[1] not in ["ttl", "bundle", "build", "chain"]:
     print("Usage: {} ttl plugin_file.py".format(sys.argv[0]))
+    print("       {} bundle plugin_file.py [rate [budget]]"
+          .format(sys.argv[0]))
+    print("       {} build plugin_file.py [...]".format(sys.argv[0]))
+    print("       {} chain bundle_dir plugin_file.py [...]"
+          .format(sys.argv[0]))
     exit(1)
 
+  logging.basicConfig(level=logging.INFO, format="%(message)s")
+  if sys.argv[1] == "build": # Incremental, dependency-aware builds
+    from .deps import build_incremental
+    results = build_incremental(sys.argv[2:], "lz2lv2deps.json")
+    for fname in sys.argv[2:]:
+      print("{}: {}".format(fname, "built" if fname in results
+                                           else "up to date"))
+    return
+
+  if sys.argv[1] == "chain": # Fused plugins in series
+    print(build_chain(sys.argv[3:], sys.argv[2]))
+    return
+
   fname = sys.argv[2]
+  if sys.argv[1] == "bundle":
+    rate = float(sys.argv[3]) if len(sys.argv) > 3 else None
+    budget = float(sys.argv[4]) if len(sys.argv) > 4 else None # ns/sample
+    bundle_dir = os.path.splitext(fname)[0] + ".lv2"
+    print(build_bundle(fname, bundle_dir, rate=rate, budget=budget,
+                       ttl_cost=True))
+    return
+
   ttl = build_manifest_ttl_data(fname)
   out_fname = os.path.splitext(fname)[0] + ".ttl"
   with open(out_fname, "w") as f:
@@ -0,0 +1,834 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Created on Mon 2026-10-19 08:28:33 BRT
+# License is GPLv3, see COPYING.txt for more details.
+# @author: Danilo de Jesus da Silva Bellini
+"""
+lz2lv2 C code generation module.
+"""
+
+from __future__ import division
+
+from audiolazy import LinearFilter, Stream
+from string import Template
+from numbers import Number
+import logging, math
+from .core import ns2model
+from .trace import trace
+from .multirate import Multirate
+
+
+logger = logging.getLogger(__name__)
+
+# LV2 core ABI (the lv2.h contents needed), so the generated code can be
+# compiled without having the LV2 development headers installed
+lv2_abi = """
+#include <math.h>
+#include <stdint.h>
+#include <stdlib.h>
+#include <string.h>
+
+typedef void *LV2_Handle;
+
+typedef struct _LV2_Feature {
+  const char *URI;
+  void *data;
+} LV2_Feature;
+
+typedef struct _LV2_Descriptor {
+  const char *URI;
+  LV2_Handle (*instantiate)(const struct _LV2_Descriptor *descriptor,
+                            double sample_rate,
+                            const char *bundle_path,
+                            const LV2_Feature *const *features);
+  void (*connect_port)(LV2_Handle instance, uint32_t port,
+                       void *data_location);
+  void (*activate)(LV2_Handle instance);
+  void (*run)(LV2_Handle instance, uint32_t sample_count);
+  void (*deactivate)(LV2_Handle instance);
+  void (*cleanup)(LV2_Handle instance);
+  const void *(*extension_data)(const char *uri);
+} LV2_Descriptor;
+
+#define LV2_SYMBOL_EXPORT __attribute__((visibility("default")))
+"""
+
+
+# Everything but the state declaration and the run function body, which
+# depend on the plugin process
+plugin_template = Template("""
+#define NPORTS $nports
+#define RATE $rate
+
+#if defined(__GNUC__)
+typedef float vfloat __attribute__((vector_size($vector_size)));
+#endif
+
+typedef struct {
+  float *ports[NPORTS];
+$state
+} Plugin;
+
+static LV2_Handle instantiate(const LV2_Descriptor *descriptor,
+                              double sample_rate,
+                              const char *bundle_path,
+                              const LV2_Feature *const *features)
+{
+  if (RATE > 0 && sample_rate != RATE) return NULL;
+  return (LV2_Handle) calloc(1, sizeof(Plugin));
+}
+
+static void connect_port(LV2_Handle instance, uint32_t port, void *data)
+{
+  if (port < NPORTS) ((Plugin *) instance)->ports[port] = (float *) data;
+}
+
+static void activate(LV2_Handle instance)
+{
+  Plugin *self = (Plugin *) instance;
+  float *ports[NPORTS];
+  memcpy(ports, self->ports, sizeof(ports));
+  memset(self, 0, sizeof(Plugin));
+  memcpy(self->ports, ports, sizeof(ports));
+}
+
+static void run(LV2_Handle instance, uint32_t sample_count)
+{
+  Plugin *self = (Plugin *) instance;
+$run
+}
+
+static void cleanup(LV2_Handle instance)
+{
+  free(instance);
+}
+
+static const LV2_Descriptor descriptor = {
+  "$uri",
+  instantiate,
+  connect_port,
+  activate,
+  run,
+  NULL,
+  cleanup,
+  NULL,
+};
+
+LV2_SYMBOL_EXPORT const LV2_Descriptor *lv2_descriptor(uint32_t index)
+{
+  return index == 0 ? &descriptor : NULL;
+}
+""")
+
+
+def c_float(value):
+  """
+  C double literal from a Python number, or the ``math.h`` macro for the
+  infinities and NaN.
+  """
+  value = float(value)
+  if math.isnan(value):
+    return "NAN"
+  if math.isinf(value):
+    return "-INFINITY" if value < 0 else "INFINITY"
+  return repr(value)
+
+
+def linear_coeffs(filt):
+  """
+  Numerator and denominator coefficients of a causal time invariant linear
+  filter as two lists of floats, indexed by the delay and normalized so that
+  the first denominator coefficient is 1.
+  """
+  coeffs = list(filt.numpoly.terms()) + list(filt.denpoly.terms())
+  if any(delay < 0 for delay, value in coeffs):
+    raise ValueError("Non-causal filter")
+  if not all(isinstance(value, Number) and not isinstance(value, Stream)
+             for delay, value in coeffs):
+    raise TypeError("Time variant filters can't be compiled")
+  gain = filt.denpoly[0]
+  if gain == 0:
+    raise ZeroDivisionError("Invalid filter gain")
+  b = [filt.numpoly[idx] / gain for idx in range(len(filt.numerator))]
+  a = [filt.denpoly[idx] / gain for idx in range(len(filt.denominator))]
+  return [float(el) for el in b], [float(el) for el in a]
+
+
+# Default tolerances for the filter simplification (see ``simplify_filter``)
+coeff_tolerance = 1e-12
+root_tolerance = 1e-7
+
+
+def multiplies(b, a):
+  """ Number of multiplications per sample done with non-zero coefficients. """
+  return sum(coeff != 0 for coeff in b) + sum(coeff != 0 for coeff in a[1:])
+
+
+def strip_coeffs(coeffs, tolerance):
+  """
+  Coefficients with the ones whose magnitude is below the tolerance,
+  relative to the largest magnitude among them, replaced by zeros, and
+  without the trailing zeros (keeping at least one). The tolerance is
+  relative as the gain of a narrow lowpass filter is tiny, and a non-zero
+  polynomial never becomes zero.
+  """
+  threshold = tolerance * max([abs(coeff) for coeff in coeffs] or [0.])
+  coeffs = [0. if abs(coeff) < threshold else coeff for coeff in coeffs]
+  while len(coeffs) > 1 and coeffs[-1] == 0:
+    coeffs.pop()
+  return coeffs
+
+
+def cancel_roots(b, a, tolerance):
+  """
+  Cancel the near-coincident roots (poles and zeros) of the numerator and
+  denominator polynomials in ``z ** -1``, returning the new normalized
+  ``(b, a)``. The coefficients are kept as is when there's nothing to
+  cancel, when NumPy isn't available or when the result wouldn't be real.
+  """
+  if len(b) < 2 or len(a) < 2 or b[-1] == 0 or a[-1] == 0:
+    return b, a
+  try:
+    import numpy
+  except ImportError:
+    return b, a
+  b_roots = list(numpy.roots(b[::-1]))
+  a_roots = list(numpy.roots(a[::-1]))
+  cancelled = False
+  for root in list(a_roots):
+    distances = [abs(root - other) for other in b_roots]
+    if distances and min(distances) < tolerance:
+      b_roots.pop(distances.index(min(distances)))
+      a_roots.remove(root)
+      cancelled = True
+  if not cancelled:
+    return b, a
+  new_b = numpy.poly(b_roots)[::-1] * b[-1] if b_roots else \
+          numpy.array([b[-1]])
+  new_a = numpy.poly(a_roots)[::-1] * a[-1] if a_roots else \
+          numpy.array([a[-1]])
+  if max(abs(numpy.concatenate([new_b.imag, new_a.imag]))) > tolerance:
+    return b, a
+  gain = new_a.real[0]
+  return ([float(coeff) for coeff in new_b.real / gain],
+          [float(coeff) for coeff in new_a.real / gain])
+
+
+def simplify_filter(b, a, tolerance=coeff_tolerance,
+                    cancel_tolerance=root_tolerance):
+  """
+  Simplify a linear filter from its normalized coefficients, cancelling
+  the near-coincident poles and zeros (distance below ``cancel_tolerance``)
+  and dropping the coefficients whose magnitude is below ``tolerance``
+  times the largest one in the same polynomial.
+  """
+  b, a = strip_coeffs(b, tolerance), strip_coeffs(a, tolerance)
+  b, a = cancel_roots(b, a, cancel_tolerance)
+  return strip_coeffs(b, tolerance), strip_coeffs(a, tolerance)
+
+
+# SIMD register width in bytes assumed by the generated code, the 16 bytes
+# of the SSE2/NEON registers available on every x86-64/AArch64 CPU, as the
+# default compiler flags don't enable any wider instruction set (AVX)
+simd_bytes = 16
+
+# Number of interleaved channels in a SIMD register for the (double) direct
+# form I state
+dfi_lanes = simd_bytes // 8
+
+
+def padded_channels(channels, lanes=dfi_lanes):
+  """
+  Number of interleaved state channels for the given audio channels, padded
+  to fill whole SIMD registers with the given number of lanes. A single
+  channel is kept as is (scalar code).
+  """
+  if channels == 1:
+    return 1
+  return -(-channels // lanes) * lanes
+
+
+def dfi_step(b, a, x, y, x_state, y_state):
+  """
+  A single direct form I filtering step in C.
+
+  Parameters
+  ----------
+  b, a :
+    Normalized filter coefficients.
+  x, y :
+    C expressions for the current input and output samples.
+  x_state, y_state :
+    Templates (for ``str.format``) of the C expressions for the past input
+    and output samples, getting the delay minus one as the only argument.
+
+  Returns
+  -------
+  A pair with the C expression for the output sample and the list of C
+  statements that updates the state with the current samples.
+  """
+  terms = []
+  for delay, coeff in enumerate(b):
+    if coeff != 0:
+      value = x if delay == 0 else x_state.format(delay - 1)
+      terms.append("{} * {}".format(c_float(coeff), value))
+  for delay, coeff in enumerate(a[1:]):
+    if coeff != 0:
+      terms.append("{} * {}".format(c_float(-coeff), y_state.format(delay)))
+  updates = []
+  for past, current, size in [(y_state, y, len(a) - 1),
+                              (x_state, x, len(b) - 1)]:
+    updates += ["{} = {};".format(past.format(delay), past.format(delay - 1))
+                for delay in range(size - 1, 0, -1)]
+    if size > 0:
+      updates.append("{} = {};".format(past.format(0), current))
+  return " + ".join(terms) or "0.0", updates
+
+
+def dfi_lines(b, a, channels=1, indent_level=1, indent_size=2):
+  """
+  Lines of C code with the direct form I implementation of a linear filter
+  from its normalized coefficients, as the body of the ``run`` function.
+  The input and output past values are kept in the ``x`` and ``y`` members,
+  which are arrays of past samples (the delay minus one is the index) for a
+  single channel, or arrays of interleaved channel frames (the channel is
+  the last index) otherwise. All channels are processed together by the
+  same loop, so each coefficient multiplies a whole SIMD register of
+  channels.
+  """
+  pad = padded_channels(channels)
+  indent = " " * indent_size
+  if channels == 1:
+    expr, updates = dfi_step(b, a, "x", "y", "self->x[{}]", "self->y[{}]")
+    body = ["const double x = in[n];",
+            "const double y = {};".format(expr)]
+    body += updates
+    body.append("out[n] = (float) y;")
+    lines = ["const float *in = self->ports[0];",
+             "float *out = self->ports[1];",
+             "uint32_t n;"]
+  else:
+    expr, updates = dfi_step(b, a, "x[c]", "y[c]",
+                             "self->x[{}][c]", "self->y[{}][c]")
+    body = ["double x[{}], y[{}];".format(pad, pad),
+            "for (c = 0; c < {}; c++)".format(channels),
+            indent + "x[c] = self->ports[c][n];"]
+    if pad > channels:
+      body += ["for (c = {}; c < {}; c++)".format(channels, pad),
+               indent + "x[c] = 0.0;"]
+    body += ["for (c = 0; c < {}; c++)".format(pad),
+             indent + "y[c] = {};".format(expr),
+             "for (c = 0; c < {}; c++) {{".format(pad)]
+    body += [indent + line for line in updates]
+    body.append("}")
+    body += ["for (c = 0; c < {}; c++)".format(channels),
+             indent + "self->ports[{} + c][n] = (float) y[c];"
+                      .format(channels)]
+    lines = ["uint32_t n, c;"]
+  lines.append("for (n = 0; n < sample_count; n++) {")
+  lines += [indent + line for line in body]
+  lines.append("}")
+  return [indent * indent_level + line for line in lines]
+
+
+def dfi_state_lines(b, a, channels=1, indent_level=1, indent_size=2):
+  """ Lines of C code declaring the state used by ``dfi_lines``. """
+  pad = padded_channels(channels)
+  frame = "" if channels == 1 else \
+          "[{}] __attribute__((aligned(64)))".format(pad)
+  return [" " * indent_size * indent_level +
+          "double {}[{}]{};".format(name, max(size - 1, 1), frame)
+          for name, size in [("x", len(b)), ("y", len(a))]]
+
+
+# Block size, SIMD width (in floats, see ``simd_bytes``) and number of vector
+# accumulators per iteration (register blocking) for the FIR engine
+fir_chunk = 256
+fir_lanes = simd_bytes // 4
+fir_vectors = 4
+
+# Tap count range where the direct form FIR is chosen as the default engine
+fir_min_taps = 8
+fir_max_taps = 512
+
+
+def fir_lines(b, a, channels=1, indent_level=1, indent_size=2):
+  """
+  Lines of C code with a block oriented FIR (direct form) implementation,
+  as the body of the ``run`` function. The input is copied to a contiguous
+  history buffer (the ``hist`` member, with the past ``len(b) - 1`` samples
+  at its beginning) in chunks, and several output samples are computed per
+  iteration with GCC/Clang vector extensions (``fir_vectors`` independent
+  accumulators, then single vectors), with a scalar fallback for other
+  compilers and for the last samples in each chunk. It's
+  single-channel, and the denominator should be ``[1.]``.
+  """
+  if channels != 1 or a != [1.]:
+    raise ValueError("The FIR engine needs a single channel FIR filter")
+  indent = " " * indent_size
+  ntaps = len(b)
+  coeffs = ", ".join(c_float(coeff) for coeff in b)
+  lines = [
+    "static const float coeffs[{}] = {{{}}};".format(ntaps, coeffs),
+    "const float *in = self->ports[0];",
+    "float *out = self->ports[1];",
+    "float *x = self->hist + {};".format(ntaps - 1),
+    "uint32_t start, size, i, k;",
+    "for (start = 0; start < sample_count; start += size) {",
+    indent + "size = sample_count - start < {0} ? sample_count - start "
+             ": {0};".format(fir_chunk),
+    indent + "memcpy(x, in + start, size * sizeof(float));",
+    indent + "i = 0;",
+    "#if defined(__GNUC__)",
+  ]
+  for nvec in [fir_vectors, 1]: # Register blocking, then single vectors
+    step = nvec * fir_lanes
+    lines += [
+      indent + "for (; i + {0} <= size; i += {0}) {{".format(step),
+      indent * 2 + "vfloat {};".format(", ".join("acc{} = {{0}}".format(idx)
+                                                 for idx in range(nvec))),
+      indent * 2 + "for (k = 0; k < {}; k++) {{".format(ntaps),
+      indent * 3 + "vfloat {};".format(", ".join("v{}".format(idx)
+                                                 for idx in range(nvec))),
+    ]
+    for idx in range(nvec):
+      lines += [
+        indent * 3 + "memcpy(&v{0}, x + i + {1} - k, sizeof(vfloat));"
+                     .format(idx, idx * fir_lanes),
+        indent * 3 + "acc{0} += v{0} * coeffs[k];".format(idx),
+      ]
+    lines.append(indent * 2 + "}")
+    lines += [indent * 2 + "memcpy(out + start + i + {1}, &acc{0}, "
+                           "sizeof(vfloat));".format(idx, idx * fir_lanes)
+              for idx in range(nvec)]
+    lines.append(indent + "}")
+  lines += [
+    "#endif",
+    indent + "for (; i < size; i++) {",
+    indent * 2 + "float acc = 0.f;",
+    indent * 2 + "for (k = 0; k < {}; k++)".format(ntaps),
+    indent * 3 + "acc += *(x + i - k) * coeffs[k];",
+    indent * 2 + "out[start + i] = acc;",
+    indent + "}",
+  ]
+  if ntaps > 1:
+    lines.append(indent + "memmove(self->hist, self->hist + size, "
+                          "{} * sizeof(float));".format(ntaps - 1))
+  lines.append("}")
+  return [(indent * indent_level if line[0] != "#" else "") + line
+          for line in lines]
+
+
+def fir_state_lines(b, a, channels=1, indent_level=1, indent_size=2):
+  """ Lines of C code declaring the state used by ``fir_lines``. """
+  return [" " * indent_size * indent_level +
+          "float hist[{}] __attribute__((aligned(64)));"
+          .format(len(b) - 1 + fir_chunk)]
+
+
+def ring_size(delays):
+  """ Power of two size of a circular buffer for the given delays. """
+  size = 1
+  while size <= max(delays):
+    size *= 2
+  return size
+
+
+def sparse_lines(b, a, channels=1, indent_level=1, indent_size=2):
+  """
+  Lines of C code with a sparse direct form I implementation of a linear
+  filter, as the body of the ``run`` function. Only the non-zero
+  coefficients are used, and the past samples are stored in circular
+  buffers (the ``x`` and ``y`` members, one per channel) with the minimal
+  power of two size, indexed by the ``pos`` member, so there's no state
+  shifting.
+  """
+  indent = " " * indent_size
+  x_delays = [delay for delay, coeff in enumerate(b) if delay and coeff]
+  y_delays = [delay for delay, coeff in enumerate(a) if delay and coeff]
+  terms = []
+  for name, delays, coeffs, sign in [("x", x_delays, b, 1),
+                                     ("y", y_delays, a, -1)]:
+    if delays:
+      mask = ring_size(delays) - 1
+      terms += ["{} * {}s[(p - {}) & {}]".format(c_float(sign * coeffs[delay]),
+                                                 name, delay, mask)
+                for delay in delays]
+  if b[0]:
+    terms.insert(0, "{} * x".format(c_float(b[0])))
+  body = ["const double x = in[n];"]
+  if x_delays:
+    body.append("xs[p & {}] = x;".format(ring_size(x_delays) - 1))
+  body.append("const double y = {};".format(" + ".join(terms) or "0.0"))
+  if y_delays:
+    body.append("ys[p & {}] = y;".format(ring_size(y_delays) - 1))
+  body.append("out[n] = (float) y;")
+
+  lines = [
+    "uint32_t n, c, p = self->pos;",
+    "for (c = 0; c < {}; c++) {{".format(channels),
+    indent + "const float *in = self->ports[c];",
+    indent + "float *out = self->ports[{} + c];".format(channels),
+  ]
+  lines += [indent + "double *{0}s = self->{0}[c];".format(name)
+            for name, delays in [("x", x_delays), ("y", y_delays)] if delays]
+  lines += [indent + "p = self->pos;",
+            indent + "for (n = 0; n < sample_count; n++, p++) {"]
+  lines += [indent * 2 + line for line in body]
+  lines += [indent + "}", "}", "self->pos = p;"]
+  return [indent * indent_level + line for line in lines]
+
+
+def sparse_state_lines(b, a, channels=1, indent_level=1, indent_size=2):
+  """ Lines of C code declaring the state used by ``sparse_lines``. """
+  lines = ["uint32_t pos;"]
+  for name, coeffs in [("x", b), ("y", a)]:
+    delays = [delay for delay, coeff in enumerate(coeffs) if delay and coeff]
+    if delays:
+      lines.append("double {}[{}][{}];".format(name, channels,
+                                               ring_size(delays)))
+  return [" " * indent_size * indent_level + line for line in lines]
+
+
+# Code generation engines for linear filters, each one as a pair of
+# functions returning the state declaration lines and the run body lines
+engines = {
+  "dfi": (dfi_state_lines, dfi_lines),
+  "fir": (fir_state_lines, fir_lines),
+  "sparse": (sparse_state_lines, sparse_lines),
+}
+
+# Maximum ratio of non-zero coefficients for the sparse engine to be chosen
+sparse_max_density = .5
+
+
+def default_engine(b, a, channels=1):
+  """
+  Name of the default engine for the given linear filter. Multichannel
+  filters use the channel-interleaved state of the "dfi" engine, as the
+  "sparse" engine keeps a separate ring buffer for each channel.
+  """
+  if channels == 1 and len(b) + len(a) > 4 and \
+     multiplies(b, a) <= sparse_max_density * (len(b) + len(a) - 1):
+    return "sparse"
+  if channels == 1 and a == [1.] and fir_min_taps <= len(b) <= fir_max_taps:
+    return "fir"
+  return "dfi"
+
+
+# C code templates for the expression graph operators
+c_operators = {
+  "add": "{} + {}",
+  "sub": "{} - {}",
+  "mul": "{} * {}",
+  "div": "{} / {}",
+  "pow": "pow({}, {})",
+  "neg": "-{}",
+  "call": "{name}({})",
+}
+
+
+def graph_operand(node):
+  """ C expression for a node used as an operand. """
+  if node.op == "const":
+    return c_float(node.value).join("()" if node.value < 0 else ["", ""])
+  return "t{}".format(node.index)
+
+
+def graph_step(graph, output):
+  """
+  A single step of the expression graph (from ``trace``) in C, i.e., the
+  computation of the output for a single sample, whose input should be
+  available in a variable named as ``graph_operand(graph.input)``.
+
+  Returns
+  -------
+  A pair with the list of C statements and the C expression for the output
+  sample.
+  """
+  lines = []
+  for node in graph.reachable(output):
+    if node.op in ["const", "input"]:
+      continue
+    args = [graph_operand(arg) for arg in node.args]
+    if node.op == "filter":
+      b, a = node.value
+      name = "f{}_".format(node.index)
+      expr, updates = dfi_step(b, a, args[0], graph_operand(node),
+                               name + "x[{}]", name + "y[{}]")
+    else:
+      expr = c_operators[node.op].format(*args, name=node.value)
+      updates = []
+    lines.append("const double {} = {};".format(graph_operand(node), expr))
+    lines += updates
+  return lines, graph_operand(output)
+
+
+def graph_filter_lines(graph, output):
+  """
+  Lines of C code with the pointers to the filter states for the channel
+  ``c`` (see ``graph_lines``), only the ones used by ``dfi_step``.
+  """
+  return ["double *f{0}_{1} = self->f{0}_{1}[c];".format(node.index, name)
+          for node in graph.reachable(output) if node.op == "filter"
+          for name, coeffs in zip("xy", node.value) if len(coeffs) > 1]
+
+
+def graph_lines(graph, output, channels=1, indent_level=1, indent_size=2):
+  """
+  Lines of C code with a single fused loop computing the expression graph
+  output (from ``trace``) for each sample, as the body of the ``run``
+  function. Filter states are the ``fN_x`` and ``fN_y`` members, where
+  ``N`` is the node index, each having one array of past samples per
+  channel.
+  """
+  indent = " " * indent_size
+  body, expr = graph_step(graph, output)
+  body.append("out[n] = (float) {};".format(expr))
+  lines = [
+    "uint32_t n, c;",
+    "for (c = 0; c < {}; c++) {{".format(channels),
+    indent + "float *out = self->ports[{} + c];".format(channels),
+  ]
+  if graph.input in graph.reachable(output):
+    body.insert(0, "const double {} = in[n];".format(
+      graph_operand(graph.input)
+    ))
+    lines.insert(2, indent + "const float *in = self->ports[c];")
+
+  lines += [indent + line for line in graph_filter_lines(graph, output)]
+  lines.append(indent + "for (n = 0; n < sample_count; n++) {")
+  lines += [indent * 2 + line for line in body]
+  lines += [indent + "}", "}"]
+  return [indent * indent_level + line for line in lines]
+
+
+def graph_state_lines(graph, output, channels=1, indent_level=1,
+                      indent_size=2):
+  """ Lines of C code declaring the state used by ``graph_lines``. """
+  lines = []
+  for node in graph.reachable(output):
+    if node.op == "filter":
+      for name, coeffs in zip("xy", node.value):
+        lines.append("double f{}_{}[{}][{}];".format(
+          node.index, name, channels, max(len(coeffs) - 1, 1)
+        ))
+  return [" " * indent_size * indent_level + line
+          for line in lines or ["char unused;"]]
+
+
+def c_array(values):
+  """ C array initializer from a (possibly nested) list of numbers. """
+  if isinstance(values, list):
+    return "{" + ", ".join(c_array(value) for value in values) + "}"
+  return c_float(values)
+
+
+# Number of independent accumulators (i.e., partial sums) in the multirate
+# FIR filters, so the additions don't wait each other
+multirate_accumulators = 4
+
+
+def polyphase(taps, factor):
+  """
+  Polyphase decomposition of the FIR filter coefficients, a list with
+  ``factor`` lists of the same size (zero padded to a multiple of
+  ``multirate_accumulators``), the ``p``-th one having the coefficients
+  ``taps[p::factor]``.
+  """
+  size = -(-len(taps) // factor)
+  size += -size % multirate_accumulators
+  padded = list(taps) + [0.] * (size * factor - len(taps))
+  return [padded[phase::factor] for phase in range(factor)]
+
+
+def dot_lines(result, coeffs, samples, size, indent_size=2):
+  """
+  Lines of C code assigning to the ``result`` variable the dot product of
+  the ``coeffs`` and ``samples`` arrays (C expressions) with the given
+  ``size``, a multiple of ``multirate_accumulators``.
+  """
+  indent = " " * indent_size
+  nacc = multirate_accumulators
+  return [
+    "{",
+    indent + "double acc[{}] = {{0.0}};".format(nacc),
+    indent + "uint32_t k, j;",
+    indent + "for (k = 0; k < {}; k += {})".format(size, nacc),
+    indent * 2 + "for (j = 0; j < {}; j++)".format(nacc),
+    indent * 3 + "acc[j] += {}[k + j] * {}[k + j];".format(coeffs, samples),
+    indent + "{} = {};".format(result, " + ".join(
+      "acc[{}]".format(idx) for idx in range(nacc)
+    )),
+    "}",
+  ]
+
+
+def multirate_lines(factor, dec_taps, int_taps, graph, output, channels=1,
+                    indent_level=1, indent_size=2):
+  """
+  Lines of C code with a multirate process (see the ``multirate`` module),
+  as the body of the ``run`` function. The decimator computes just the
+  retained samples, when the ``phase`` member is zero, whose expression
+  graph (from ``trace``) output is given to a polyphase interpolator. The
+  histories of both are the ``dx`` and ``ey`` members, doubled so the FIR
+  filters read contiguous data from the ``dpos`` and ``epos`` positions
+  (one per channel).
+  """
+  indent = " " * indent_size
+  dec_taps, = polyphase(dec_taps, 1)
+  dsize = len(dec_taps)
+  phases = polyphase(int_taps, factor)
+  esize = len(phases[0])
+  step, expr = graph_step(graph, output)
+  decimated = graph_operand(graph.input)
+  retained = ["double {};".format(decimated)]
+  retained += dot_lines(decimated, "hd", "(dx + dpos)", dsize, indent_size)
+  retained += step + [
+    "epos = epos ? epos - 1 : {};".format(esize - 1),
+    "ey[epos] = ey[epos + {}] = {};".format(esize, expr),
+  ]
+  body = [
+    "double y;",
+    "dpos = dpos ? dpos - 1 : {};".format(dsize - 1),
+    "dx[dpos] = dx[dpos + {}] = in[n];".format(dsize),
+    "if (p == 0) {",
+  ] + [indent + line for line in retained] + ["}"]
+  body += dot_lines("y", "hi[p]", "(ey + epos)", esize, indent_size)
+  body += [
+    "out[n] = (float) y;",
+    "p = p == {} ? 0 : p + 1;".format(factor - 1),
+  ]
+
+  lines = [
+    "static const double hd[{}] = {};".format(dsize, c_array(dec_taps)),
+    "static const double hi[{}][{}] = {};".format(factor, esize,
+                                                 c_array(phases)),
+    "uint32_t n, c, p = self->phase;",
+    "for (c = 0; c < {}; c++) {{".format(channels),
+    indent + "const float *in = self->ports[c];",
+    indent + "float *out = self->ports[{} + c];".format(channels),
+    indent + "double *dx = self->dx[c], *ey = self->ey[c];",
+    indent + "uint32_t dpos = self->dpos[c], epos = self->epos[c];",
+  ]
+  lines += [indent + line for line in graph_filter_lines(graph, output)]
+  lines += [indent + "p = self->phase;",
+            indent + "for (n = 0; n < sample_count; n++) {"]
+  lines += [indent * 2 + line for line in body]
+  lines += [indent + "}",
+            indent + "self->dpos[c] = dpos;",
+            indent + "self->epos[c] = epos;",
+            "}",
+            "self->phase = p;"]
+  return [indent * indent_level + line for line in lines]
+
+
+def multirate_state_lines(factor, dec_taps, int_taps, graph, output,
+                          channels=1, indent_level=1, indent_size=2):
+  """ Lines of C code declaring the state used by ``multirate_lines``. """
+  dsize = len(polyphase(dec_taps, 1)[0])
+  esize = len(polyphase(int_taps, factor)[0])
+  lines = [
+    "uint32_t phase, dpos[{0}], epos[{0}];".format(channels),
+    "double dx[{}][{}];".format(channels, 2 * dsize),
+    "double ey[{}][{}];".format(channels, 2 * esize),
+  ]
+  lines += graph_state_lines(graph, output, channels, indent_level=0)
+  return [" " * indent_size * indent_level + line for line in lines]
+
+
+# Every kernel, i.e., the linear filter engines, the traced graphs and the
+# multirate processes
+kernels = dict(engines, trace=(graph_state_lines, graph_lines),
+               multirate=(multirate_state_lines, multirate_lines))
+
+
+def ns2kernel(ns, engine=None, tolerance=coeff_tolerance):
+  """
+  Choose the kernel for the ``process`` of a Python Namespace (with a
+  ``Metadata`` class and a ``process``), i.e., the code generation engine
+  and its data.
+
+  A linear filter is simplified (see ``simplify_filter``) and its C code is
+  generated by an engine, while any other callable is traced with the
+  ``trace`` module (see ``ns2c`` for the parameters), including the process
+  inside a ``Multirate`` instance.
+
+  Returns
+  -------
+  A pair with the engine name (``"trace"`` for the traced processes) and a
+  tuple with the data for that engine, which is the normalized ``(b, a)``
+  filter coefficients pair for the linear filter engines, the
+  ``(graph, output)`` pair for the traced processes or the
+  ``(factor, decimator_taps, interpolator_taps, graph, output)`` tuple for
+  the multirate processes (``"multirate"``).
+  """
+  process = ns["process"]
+  if isinstance(process, LinearFilter):
+    b, a = linear_coeffs(process)
+    before = multiplies(b, a)
+    if tolerance is not None:
+      b, a = simplify_filter(b, a, tolerance=tolerance)
+    logger.info("%s: %d multiplies per sample (%d before simplifying)",
+                ns2model(ns).uri, multiplies(b, a), before)
+    return engine or default_engine(b, a, ns2model(ns).channels), (b, a)
+  if callable(process):
+    if engine is not None:
+      raise ValueError("Engines are only for linear filters")
+    if isinstance(process, Multirate):
+      return "multirate", (process.factor, process.taps,
+                           process.interpolator_taps) + \
+                          trace(process.process, tolerance=tolerance)
+    return "trace", trace(process, tolerance=tolerance)
+  raise TypeError("Can't generate C code for a {} process"
+                  .format(type(process).__name__))
+
+
+def ns2c(ns, rate=None, engine=None, tolerance=coeff_tolerance,
+         kernel=None):
+  """
+  Python Namespace (with a ``Metadata`` class and a ``process``) to the C
+  source code string of a LV2 plugin. The same process is applied to every
+  channel.
+
+  The ``process`` might be a linear filter, whose C code is generated by an
+  engine, or a callable that gets and returns a Stream, traced and fused in
+  a single loop (see the ``trace`` module). Tracing raises a ``TraceError``
+  for unsupported constructs.
+
+  Parameters
+  ----------
+  ns :
+    The plugin namespace, as returned by ``run_source``.
+  rate :
+    Sample rate the plugin coefficients were designed for. The generated
+    plugin refuses to be instantiated with another rate. Defaults to None,
+    meaning any rate is accepted (i.e., the ``process`` doesn't depend on
+    the rate).
+  engine :
+    Name of the code generation engine for linear filters, a key in the
+    ``engines`` dictionary. Defaults to None, meaning ``default_engine``
+    chooses it.
+  tolerance :
+    Linear filters are simplified (see ``simplify_filter``) before the code
+    generation, dropping the coefficients whose magnitude is below this
+    value times the largest one in the same polynomial. Defaults to
+    ``coeff_tolerance``, and None means no simplification.
+  kernel :
+    The ``(name, data)`` pair returned by ``ns2kernel``, when it was already
+    chosen (the ``engine`` and ``tolerance`` are then ignored). Defaults to
+    None, meaning it should be chosen.
+  """
+  model = ns2model(ns)
+  name, data = kernel or ns2kernel(ns, engine=engine, tolerance=tolerance)
+  state_lines, run_lines = kernels[name]
+  state = state_lines(*data, channels=model.channels)
+  run = run_lines(*data, channels=model.channels)
+  return "".join([lv2_abi, plugin_template.substitute(
+    nports = len(model.ports),
+    rate = c_float(rate or 0),
+    vector_size = simd_bytes,
+    state = "\n".join(state),
+    run = "\n".join(run),
+    uri = model.uri,
+  )])
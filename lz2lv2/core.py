@@ -11,7 +11,10 @@ from __future__ import division
 
 from collections import OrderedDict
 from audiolazy import Stream, thub
+from functools import partial
 import os
+from .multirate import rate_values, Decimated
+from .metadata import PluginMetadata, Port, Person, License
 
 
 # Common prefixes for Turtle files (only the used ones are stored in output)
@@ -20,42 +23,42 @@ ttl_prefixes = {
   "doap" : "http://usefulinc.com/ns/doap#",
   "foaf" : "http://xmlns.com/foaf/0.1/",
   "rdfs" : "http://www.w3.org/2000/01/rdf-schema#",
+  "lz2lv2" : "http://github.com/danilobellini/lz2lv2#",
 }
 
 
-# Code preamble to run "prepend" the plugin code to make some values available
+# Code preamble to run "prepend" the plugin code to make some values available,
+# besides the rate dependent ones (see ``multirate.rate_values``) and the
+# ``decimated`` multirate stage
 preamble = """
 from audiolazy import *
-s, Hz = sHz(rate)
-ms = 1e-3 * s
-kHz = 1e3 * Hz
 """
 
 
-def run_source(src, fname):
+def run_source(src, fname, rate=1):
   """
   Run the given source code string object, supposed to be from file ``fname``,
-  and returns the resulting locals namespace.
+  and returns the resulting locals namespace. The ``rate`` is the sample rate
+  seen by the plugin code, defaults to 1 (i.e., frequencies in rad/sample).
   """
-  ns = dict(__file__ = fname, rate = 1)
+  ns = dict(__file__ = fname)
   exec(preamble, ns, ns)
+  ns.update(rate_values(rate))
+  ns["decimated"] = partial(Decimated, ns)
   exec(src, ns, ns)
   return ns
 
 
-def ns2metadata(ns):
+def ns2model(ns):
   """
-  Python Namespace (with a ``Metadata`` class) to a "metadata object".
-
-  A metadata object is a common dictionary instance with an ``uri`` attribute.
+  Python Namespace (with a ``Metadata`` class) to a ``PluginMetadata``
+  instance.
   """
   mdict = vars(ns["Metadata"])
   fname = os.path.splitext(os.path.split(ns["__file__"])[1])[0]
-  mdata = OrderedDict()
-  mdata.uri = mdict["uri"]
 
   # Plugin LV2 class (SpectralPlugin, UtilityPlugin, DelayPlugin, etc.)
-  mdata["a"] = ["lv2:Plugin"]
+  plugin_classes = ["lv2:Plugin"]
   if "lv2class" in mdict:
     classes = mdict["lv2class"]
     if not isinstance(classes, (tuple, list)):
@@ -65,57 +68,158 @@ def ns2metadata(ns):
         cls = "lv2:" + cls
       if not cls.endswith("Plugin"):
         cls = cls + "Plugin"
-      if cls not in mdata["a"]:
-        mdata["a"].append(cls)
-
-  # Default output filename
-  mdata["lv2:binary"] = ["<{}.so>".format(fname)]
-
-  # Default port assignment
-  mdata["lv2:port"] = [
-    OrderedDict([
-      ("a", ["lv2:AudioPort", "lv2:InputPort"]),
-      ("lv2:index", [0]),
-      ("lv2:symbol", ['"In"']),
-      ("lv2:name", ['"In"']),
-    ]),
-    OrderedDict([
-      ("a", ["lv2:AudioPort", "lv2:OutputPort"]),
-      ("lv2:index", [1]),
-      ("lv2:symbol", ['"Out"']),
-      ("lv2:name", ['"Out"']),
-    ]),
-  ]
-
-  # Plugin name (required by LV2), can't build the plugin without it
-  mdata["doap:name"] = [mdict["name"].join('""')]
+      if cls not in plugin_classes:
+        plugin_classes.append(cls)
+
+  # Audio port assignment, all inputs before the outputs, one per channel
+  channels = mdict.get("channels", 1)
+  if not isinstance(channels, int) or channels < 1:
+    raise ValueError("Invalid number of channels: {!r}".format(channels))
+  ports = []
+  for direction in ["In", "Out"]:
+    for channel in range(1, channels + 1):
+      symbol = direction + (str(channel) if channels > 1 else "")
+      name = " ".join([direction, str(channel)]) if channels > 1 else symbol
+      ports.append(Port(
+        classes = ["lv2:AudioPort", "lv2:{}putPort".format(direction)],
+        index = len(ports),
+        symbol = symbol,
+        name = name,
+      ))
 
   # Author as both the developer and maintainer in one single metadata
-  if "author" in mdict:
-    mdata.setdefault("doap:developer", OrderedDict())["foaf:name"] = \
-      mdata.setdefault("doap:maintainer", OrderedDict())["foaf:name"] = \
-        ['"{}"'.format(mdict["author"])]
-  if "author_homepage" in mdict:
-    mdata.setdefault("doap:developer", OrderedDict())["foaf:homepage"] = \
-      mdata.setdefault("doap:maintainer", OrderedDict())["foaf:homepage"] = \
-        ["<{}>".format(mdict["author_homepage"])]
-  if "author_email" in mdict:
-    mdata.setdefault("doap:developer", OrderedDict())["foaf:mbox"] = \
-      mdata.setdefault("doap:maintainer", OrderedDict())["foaf:mbox"] = \
-        ["<mailto:{}>".format(mdict["author_email"])]
-
-  # Add the small license acronym (when available)
-  if "license" in mdict:
-    mdata["doap:license"] = ["<{}>".format(mdict["license"])]
-
-  # Last information to add: the comment from the docstring
-  plugin_docstring = ns.get("__doc__", None)
-  if plugin_docstring:
-    mdata["rdfs:comment"] = ['"""{}"""'.format(plugin_docstring)]
+  author = None
+  if any(k in mdict for k in ["author", "author_homepage", "author_email"]):
+    author = Person(name = mdict.get("author"),
+                    homepage = mdict.get("author_homepage"),
+                    email = mdict.get("author_email"))
+
+  return PluginMetadata(
+    uri = mdict["uri"],
+    classes = plugin_classes,
+    binary = fname + ".so", # Default output filename
+    ports = ports,
+    name = mdict["name"], # Required by LV2, can't build the plugin without it
+    developer = author,
+    maintainer = author,
+    license = License(mdict["license"]) if "license" in mdict else None,
+    comment = ns.get("__doc__", None) or None, # From the docstring
+  )
+
+
+def ttl_string(value, long=False):
+  """ Turtle string literal, optionally in the long (triple quoted) form. """
+  return ('"""{}"""' if long else '"{}"').format(value)
 
+
+def ttl_iri(value):
+  """ Turtle IRI reference. """
+  return "<{}>".format(value)
+
+
+def ttl_unquote(token):
+  """ Inverse of both ``ttl_string`` and ``ttl_iri``. """
+  for start, end in [('"""', '"""'), ('"', '"'), ("<", ">")]:
+    if len(token) >= len(start) + len(end) and token.startswith(start) \
+                                           and token.endswith(end):
+      return token[len(start):-len(end)]
+  return token
+
+
+def person2metadata(person):
+  """ ``Person`` instance to a dictionary in the metadata object format. """
+  result = OrderedDict()
+  if person.name is not None:
+    result["foaf:name"] = [ttl_string(person.name)]
+  if person.homepage is not None:
+    result["foaf:homepage"] = [ttl_iri(person.homepage)]
+  if person.email is not None:
+    result["foaf:mbox"] = [ttl_iri("mailto:" + person.email)]
+  return result
+
+
+def model2metadata(model):
+  """
+  ``PluginMetadata`` instance to a "metadata object", i.e., a common
+  dictionary instance with an ``uri`` attribute, whose values are lists of
+  Turtle tokens (or nested metadata dictionaries).
+  """
+  mdata = OrderedDict()
+  mdata.uri = model.uri
+  mdata["a"] = list(model.classes)
+  mdata["lv2:binary"] = [ttl_iri(model.binary)]
+  mdata["lv2:port"] = [OrderedDict([
+    ("a", list(port.classes)),
+    ("lv2:index", [port.index]),
+    ("lv2:symbol", [ttl_string(port.symbol)]),
+    ("lv2:name", [ttl_string(port.name)]),
+  ]) for port in model.ports]
+  mdata["doap:name"] = [ttl_string(model.name)]
+  if model.developer is not None:
+    mdata["doap:developer"] = person2metadata(model.developer)
+  if model.maintainer is not None:
+    mdata["doap:maintainer"] = person2metadata(model.maintainer)
+  if model.license is not None:
+    mdata["doap:license"] = [ttl_iri(model.license.uri)]
+  if model.comment:
+    mdata["rdfs:comment"] = [ttl_string(model.comment, long=True)]
   return mdata
 
 
+def metadata2person(mdict):
+  """ Inverse of ``person2metadata``. """
+  email = mdict.get("foaf:mbox", [None])[0]
+  if email is not None:
+    email = ttl_unquote(email)
+    if email.startswith("mailto:"):
+      email = email[len("mailto:"):]
+  return Person(
+    name = ttl_unquote(mdict["foaf:name"][0]) if "foaf:name" in mdict
+                                               else None,
+    homepage = ttl_unquote(mdict["foaf:homepage"][0])
+               if "foaf:homepage" in mdict else None,
+    email = email,
+  )
+
+
+def metadata2model(mdata):
+  """ Inverse of ``model2metadata``. """
+  developer = maintainer = None
+  if "doap:developer" in mdata:
+    developer = metadata2person(mdata["doap:developer"])
+  if "doap:maintainer" in mdata:
+    maintainer = metadata2person(mdata["doap:maintainer"])
+    if maintainer == developer:
+      maintainer = developer
+  return PluginMetadata(
+    uri = mdata.uri,
+    classes = mdata["a"],
+    binary = ttl_unquote(mdata["lv2:binary"][0]),
+    ports = [Port(classes = port["a"],
+                  index = port["lv2:index"][0],
+                  symbol = ttl_unquote(port["lv2:symbol"][0]),
+                  name = ttl_unquote(port["lv2:name"][0]))
+             for port in mdata["lv2:port"]],
+    name = ttl_unquote(mdata["doap:name"][0]),
+    developer = developer,
+    maintainer = maintainer,
+    license = License(ttl_unquote(mdata["doap:license"][0]))
+              if "doap:license" in mdata else None,
+    comment = ttl_unquote(mdata["rdfs:comment"][0])
+              if "rdfs:comment" in mdata else None,
+  )
+
+
+def ns2metadata(ns):
+  """
+  Python Namespace (with a ``Metadata`` class) to a "metadata object".
+
+  A metadata object is a common dictionary instance with an ``uri`` attribute.
+  See ``ns2model`` for a compact and picklable alternative.
+  """
+  return model2metadata(ns2model(ns))
+
+
 def ttl_tokens(item, main=False):
   """
   From an item in a metadata dictionary, generates Turtle tokens as strings.
@@ -218,8 +322,19 @@ def get_prefixes(tokens):
   return prefixes
 
 
-def metadata2ttl(mdata, **kwargs):
-  """ Metadata object to Turtle (ttl) source code string. """
+def metadata2ttl(mdata, cost=None, **kwargs):
+  """
+  Metadata object (or ``PluginMetadata`` instance) to Turtle (ttl) source
+  code string. The estimated ``cost`` in ns per sample (see the ``cost``
+  module), when given, is stored as the custom ``lz2lv2:nsPerSample``
+  property.
+  """
+  if isinstance(mdata, PluginMetadata):
+    mdata = model2metadata(mdata)
+  if cost is not None:
+    uri, mdata = mdata.uri, OrderedDict(mdata)
+    mdata.uri = uri
+    mdata["lz2lv2:nsPerSample"] = ["{:.3f}".format(cost)]
   frags = thub(ttl_single_uri_data(mdata, **kwargs), 2)
   plugin_metadata_code = "".join(frags)
   prefixes = get_prefixes(frags)
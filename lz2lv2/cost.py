@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Created on Mon 2026-10-19 08:45:57 BRT
+# License is GPLv3, see COPYING.txt for more details.
+# @author: Danilo de Jesus da Silva Bellini
+"""
+lz2lv2 static CPU cost estimation module.
+
+The operations done per sample by the generated code are counted from the
+kernel chosen for the ``process`` (see ``codegen.ns2kernel``), and a
+calibration (measured by ``bench.calibrate``) turns their weighted sum into
+an estimated time per sample.
+"""
+
+from __future__ import division
+
+from collections import OrderedDict
+import json
+from .core import ns2model
+from .codegen import (ns2kernel, multiplies, coeff_tolerance, fir_lanes,
+                      dfi_lanes, padded_channels)
+
+
+class BudgetError(ValueError):
+  """ Plugin whose estimated cost exceeds the budget. """
+
+
+# Relative weights (roughly in CPU cycles) of the operation kinds, whose
+# sum per sample is the number of "ops"
+op_weights = OrderedDict([
+  ("multiplies", 1.),
+  ("adds", 1.),
+  ("divides", 4.),
+  ("calls", 20.),
+  ("memory", .5),
+])
+
+# Calibration for each kernel as a ``(base, slope)`` pair, where the
+# estimated time per sample in a single channel is ``base + slope * ops``
+# in nanoseconds. Measured with ``bench.calibrate`` in a x86-64 CPU.
+default_calibration = {
+  "dfi": (2.5, .18),
+  "fir": (4.5, .11),
+  "sparse": (2., .26),
+  "trace": (1.4, .74),
+  "multirate": (0., .59),
+}
+
+
+def op_counts(**kwargs):
+  """ Dictionary with every operation kind count, defaulting to zero. """
+  return OrderedDict((kind, kwargs.pop(kind, 0)) for kind in op_weights)
+
+
+def dfi_ops(b, a):
+  terms = multiplies(b, a)
+  states = max(len(b) - 1, 0) + len(a) - 1
+  return op_counts(multiplies=terms, adds=max(terms - 1, 0),
+                   memory=2 + terms - any(b[:1]) + 2 * states)
+
+
+def fir_ops(b, a):
+  # Vectorized, so each operation is done for several output samples
+  return op_counts(multiplies=len(b) / fir_lanes, adds=len(b) / fir_lanes,
+                   memory=(len(b) + 3) / fir_lanes)
+
+
+def sparse_ops(b, a):
+  terms = multiplies(b, a)
+  stores = any(b[1:]) + any(a[1:]) # Circular buffers
+  return op_counts(multiplies=terms, adds=max(terms - 1, 0),
+                   memory=2 + terms - any(b[:1]) + stores)
+
+
+def trace_ops(graph, output):
+  ops = op_counts(memory=2) # Ports
+  for node in graph.reachable(output):
+    if node.op in ["add", "sub", "neg"]:
+      ops["adds"] += 1
+    elif node.op == "mul":
+      ops["multiplies"] += 1
+    elif node.op == "div":
+      ops["divides"] += 1
+    elif node.op in ["pow", "call"]:
+      ops["calls"] += 1
+    elif node.op == "filter":
+      for kind, count in dfi_ops(*node.value).items():
+        ops[kind] += count
+      ops["memory"] -= 2 # No ports
+  return ops
+
+
+def multirate_ops(factor, dec_taps, int_taps, graph, output):
+  # The decimator and the process run once every "factor" samples, but the
+  # interpolator runs for every sample with a single phase
+  fir_taps = len(dec_taps) / factor + -(-len(int_taps) // factor)
+  ops = op_counts(multiplies=fir_taps, adds=fir_taps, memory=fir_taps + 3)
+  for kind, count in trace_ops(graph, output).items():
+    ops[kind] += count / factor
+  return ops
+
+
+# Operation counters for each kernel
+kernel_ops = {
+  "dfi": dfi_ops,
+  "fir": fir_ops,
+  "sparse": sparse_ops,
+  "trace": trace_ops,
+  "multirate": multirate_ops,
+}
+
+
+def channel_scale(kernel, channels):
+  """
+  Cost of the given number of channels relative to a single one. The
+  multichannel "dfi" kernel processes the interleaved channels together,
+  one SIMD register with ``dfi_lanes`` channels at a time.
+  """
+  if kernel == "dfi" and channels > 1:
+    return padded_channels(channels) / dfi_lanes
+  return channels
+
+
+def weighted_ops(ops):
+  """ Weighted sum of the operation counts. """
+  return sum(op_weights[kind] * count for kind, count in ops.items())
+
+
+def load_calibration(fname):
+  """ Calibration from a JSON file, as written by ``save_calibration``. """
+  with open(fname, "r") as f:
+    return dict((k, tuple(v)) for k, v in json.load(f).items())
+
+
+def save_calibration(calibration, fname):
+  with open(fname, "w") as f:
+    json.dump(calibration, f, indent=2, sort_keys=True)
+
+
+def estimate_cost(ns, engine=None, tolerance=coeff_tolerance,
+                  calibration=None, kernel=None):
+  """
+  Static CPU cost estimate for a Python Namespace (with a ``Metadata`` class
+  and a ``process``). The ``engine``, ``tolerance`` and ``kernel`` are the
+  same of ``ns2c``, and the ``calibration`` defaults to
+  ``default_calibration``.
+
+  Returns
+  -------
+  Dictionary with the plugin URI, the kernel name, the number of channels,
+  the operation counts per sample in a single channel, the weighted ``ops``
+  and the estimated time per frame (i.e., per sample in every channel) in
+  nanoseconds as ``ns_per_sample``.
+  """
+  model = ns2model(ns)
+  name, data = kernel or ns2kernel(ns, engine=engine, tolerance=tolerance)
+  base, slope = (calibration or default_calibration)[name]
+  ops = kernel_ops[name](*data)
+  result = OrderedDict([
+    ("uri", model.uri),
+    ("engine", name),
+    ("channels", model.channels),
+  ])
+  result.update(ops)
+  result["ops"] = weighted_ops(ops)
+  result["ns_per_sample"] = (base + slope * result["ops"]) * \
+                           channel_scale(name, model.channels)
+  return result
+
+
+def check_budget(cost, budget):
+  """
+  Raise a ``BudgetError`` when the estimated cost (a dictionary from
+  ``estimate_cost``) exceeds the budget in ns per sample, if any.
+  """
+  if budget is not None and cost["ns_per_sample"] > budget:
+    raise BudgetError("{}: estimated {:.3f} ns/sample exceeds the {} "
+                      "ns/sample budget".format(cost["uri"],
+                                                cost["ns_per_sample"], budget))
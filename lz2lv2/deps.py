@@ -0,0 +1,276 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Created on Mon 2026-10-19 08:31:05 BRT
+# License is GPLv3, see COPYING.txt for more details.
+# @author: Danilo de Jesus da Silva Bellini
+"""
+lz2lv2 dependency tracking and incremental building module.
+"""
+
+from contextlib import contextmanager
+import os, sys, json, hashlib, sysconfig
+from .build import build_bundle
+
+try:
+  import builtins
+except ImportError: # Python 2
+  import __builtin__ as builtins
+
+try:
+  from concurrent.futures import ProcessPoolExecutor
+except ImportError: # Python 2 without the "futures" backport, serial builds
+  ProcessPoolExecutor = None
+
+
+# Directories whose modules aren't tracked (Python itself, installed
+# packages and lz2lv2), only the user modules are dependencies
+untracked_dirs = sorted(set(
+  [os.path.normcase(os.path.realpath(sysconfig.get_paths()[key]))
+   for key in ["stdlib", "platstdlib", "purelib", "platlib"]] +
+  [os.path.normcase(os.path.dirname(os.path.realpath(__file__)))]
+))
+
+# Module dependency graph for every module imported while tracking, in this
+# process. As a module body runs just once, its imports are seen just once.
+module_graph = {}
+
+
+def module_file(module):
+  """ Python source file name of a tracked module, or None. """
+  fname = getattr(module, "__file__", None)
+  if not fname:
+    return None
+  fname = os.path.realpath(fname)
+  if fname.endswith((".pyc", ".pyo")):
+    fname = fname[:-1]
+  if not fname.endswith(".py"):
+    return None
+  norm = os.path.normcase(fname)
+  if any(norm.startswith(path + os.sep) for path in untracked_dirs):
+    return None
+  return fname
+
+
+def resolve_name(name, package, level):
+  """
+  Absolute module name from a relative import with the given ``level``
+  (number of leading dots) inside the ``package``.
+  """
+  parts = package.split(".")
+  if level > len(parts):
+    raise ImportError("Relative import beyond the top level package")
+  base = ".".join(parts[:len(parts) - level + 1])
+  return ".".join([base, name]) if name else base
+
+
+def imported_modules(name, globals, fromlist, level):
+  """
+  Names of the modules whose body might have been executed by an import
+  statement, i.e., the imported module with its parent packages and the
+  submodules in the ``fromlist``.
+  """
+  if level > 0:
+    package = (globals or {}).get("__package__") or \
+              (globals or {}).get("__name__", "")
+    name = resolve_name(name, package, level)
+  parts = name.split(".")
+  names = [".".join(parts[:idx]) for idx in range(1, len(parts) + 1)]
+  names += [".".join([name, item]) for item in fromlist or ()
+            if item != "*"]
+  return names
+
+
+@contextmanager
+def track_imports():
+  """
+  Context manager that records the imports done by any module in the
+  ``module_graph``. The importer file name is taken from its ``__file__``
+  global, which ``run_source`` sets for the plugin source.
+  """
+  original_import = builtins.__import__
+  def tracking_import(name, globals=None, locals=None, fromlist=(), level=0):
+    result = original_import(name, globals, locals, fromlist, level)
+    importer = (globals or {}).get("__file__")
+    if importer:
+      importer = os.path.realpath(importer)
+      deps = module_graph.setdefault(importer, set())
+      for mod_name in imported_modules(name, globals, fromlist, level):
+        fname = module_file(sys.modules.get(mod_name))
+        if fname and fname != importer:
+          deps.add(fname)
+    return result
+  builtins.__import__ = tracking_import
+  try:
+    yield module_graph
+  finally:
+    builtins.__import__ = original_import
+
+
+def transitive_deps(graph, fname):
+  """
+  Set with the file name and all its transitive dependencies in the given
+  graph (a dictionary mapping each file name to its dependency list).
+  """
+  result = set()
+  stack = [fname]
+  while stack:
+    item = stack.pop()
+    if item not in result:
+      result.add(item)
+      stack.extend(graph.get(item, ()))
+  return result
+
+
+def forget_modules(fnames):
+  """
+  Remove the modules from the given source files from ``sys.modules`` (and
+  their ``module_graph`` entries), so they're executed again (and tracked)
+  by the next import.
+  """
+  fnames = set(fnames)
+  for name, module in list(sys.modules.items()):
+    if module_file(module) in fnames:
+      del sys.modules[name]
+  for fname in fnames:
+    module_graph.pop(fname, None)
+
+
+def file_hash(fname):
+  """ SHA-1 hex digest of the file contents, or None if it doesn't exist. """
+  try:
+    with open(fname, "rb") as f:
+      return hashlib.sha1(f.read()).hexdigest()
+  except (IOError, OSError):
+    return None
+
+
+def default_bundle_dir(fname):
+  return os.path.splitext(fname)[0] + ".lv2"
+
+
+def build_tracked(fname, bundle_dir, rate=None):
+  """
+  Build a plugin bundle (see ``build_bundle``) tracking the imports.
+
+  Returns
+  -------
+  A pair with the shared object file name and the dependency graph
+  restricted to the plugin file and its transitive dependencies.
+  """
+  fname = os.path.realpath(fname)
+  with track_imports() as graph:
+    so_fname = build_bundle(fname, bundle_dir, rate=rate)
+  return so_fname, dict((item, sorted(graph.get(item, ())))
+                        for item in transitive_deps(graph, fname))
+
+
+class DepsState(object):
+  """
+  Persistent dependency state for incremental builds, stored as JSON.
+
+  The state has the dependency ``graph`` (file name to the list of file
+  names it imports) and the ``plugins``, mapping each plugin file name to
+  its ``bundle`` directory and the ``hashes`` of the files in its transitive
+  dependencies, as seen when that plugin was built.
+  """
+  def __init__(self, fname):
+    self.fname = fname
+    self.graph, self.plugins = {}, {}
+    if os.path.isfile(fname):
+      with open(fname, "r") as f:
+        data = json.load(f)
+      self.graph = data.get("graph", {})
+      self.plugins = data.get("plugins", {})
+
+  def save(self):
+    with open(self.fname, "w") as f:
+      json.dump({"graph": self.graph, "plugins": self.plugins}, f,
+                indent=1, sort_keys=True)
+
+  def is_stale(self, fname, bundle_dir, current_hashes=None):
+    """
+    Check whether the plugin should be built, i.e., it was never built in
+    the given bundle directory, the bundle isn't there anymore or some file
+    in its transitive dependencies changed since that plugin was built.
+    """
+    fname = os.path.realpath(fname)
+    plugin = self.plugins.get(fname)
+    if not isinstance(plugin, dict) or plugin.get("bundle") != bundle_dir \
+                                    or not os.path.isdir(bundle_dir):
+      return True
+    if current_hashes is None:
+      current_hashes = {}
+    hashes = plugin.get("hashes", {})
+    for item in transitive_deps(self.graph, fname):
+      if item not in current_hashes:
+        current_hashes[item] = file_hash(item)
+      if current_hashes[item] is None or \
+         current_hashes[item] != hashes.get(item):
+        return True
+    return False
+
+  def update(self, fname, bundle_dir, graph):
+    """
+    Store the dependency graph seen when building a plugin, and the hashes
+    of the files in it for that plugin.
+    """
+    fname = os.path.realpath(fname)
+    self.graph.update(graph)
+    self.plugins[fname] = {
+      "bundle": bundle_dir,
+      "hashes": dict((item, file_hash(item)) for item in graph),
+    }
+
+
+def build_incremental(fnames, state_fname, rate=None, jobs=None,
+                      bundle_dir=default_bundle_dir):
+  """
+  Build only the plugins whose transitive dependencies changed since the
+  last build recorded in the ``state_fname`` JSON file.
+
+  Parameters
+  ----------
+  fnames :
+    Python plugin source file names.
+  state_fname :
+    File name of the persistent dependency state, created when needed.
+  rate :
+    Sample rate for the plugins (see ``build_bundle``).
+  jobs :
+    Maximum number of concurrent builds (worker processes). Defaults to
+    None, meaning the number of CPUs. When 1 (or when the
+    ``concurrent.futures`` module isn't available), everything is built in
+    this process.
+  bundle_dir :
+    Function that gets the plugin file name and returns its bundle
+    directory, defaults to the file name with a ``.lv2`` extension.
+
+  Returns
+  -------
+  Dictionary mapping each built plugin file name to its shared object file
+  name.
+  """
+  state = DepsState(state_fname)
+  hashes = {}
+  stale = [(fname, bundle_dir(fname)) for fname in fnames
+           if state.is_stale(fname, bundle_dir(fname), hashes)]
+  forget_modules(set().union(*[transitive_deps(state.graph,
+                                               os.path.realpath(fname))
+                               for fname, bdir in stale]))
+  results = {}
+  try:
+    if jobs == 1 or len(stale) < 2 or ProcessPoolExecutor is None:
+      for fname, bdir in stale:
+        results[fname], graph = build_tracked(fname, bdir, rate)
+        state.update(fname, bdir, graph)
+    else:
+      with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [(fname, bdir, executor.submit(build_tracked, fname, bdir,
+                                                 rate))
+                   for fname, bdir in stale]
+        for fname, bdir, future in futures:
+          results[fname], graph = future.result()
+          state.update(fname, bdir, graph)
+  finally:
+    state.save()
+  return results
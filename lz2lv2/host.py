@@ -0,0 +1,267 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Created on Mon 2026-10-19 08:28:56 BRT
+# License is GPLv3, see COPYING.txt for more details.
+# @author: Danilo de Jesus da Silva Bellini
+"""
+lz2lv2 in-process LV2 test host module (requires NumPy).
+"""
+
+from __future__ import division
+
+from collections import OrderedDict
+from audiolazy import Stream
+import ctypes, os, timeit, numpy
+
+
+class LV2_Feature(ctypes.Structure):
+  _fields_ = [("URI", ctypes.c_char_p), ("data", ctypes.c_void_p)]
+
+
+class LV2_Descriptor(ctypes.Structure):
+  pass
+
+LV2_Descriptor._fields_ = [
+  ("URI", ctypes.c_char_p),
+  ("instantiate", ctypes.CFUNCTYPE(ctypes.c_void_p,
+                                   ctypes.POINTER(LV2_Descriptor),
+                                   ctypes.c_double,
+                                   ctypes.c_char_p,
+                                   ctypes.POINTER(
+                                     ctypes.POINTER(LV2_Feature)))),
+  ("connect_port", ctypes.CFUNCTYPE(None, ctypes.c_void_p, ctypes.c_uint32,
+                                    ctypes.c_void_p)),
+  ("activate", ctypes.CFUNCTYPE(None, ctypes.c_void_p)),
+  ("run", ctypes.CFUNCTYPE(None, ctypes.c_void_p, ctypes.c_uint32)),
+  ("deactivate", ctypes.CFUNCTYPE(None, ctypes.c_void_p)),
+  ("cleanup", ctypes.CFUNCTYPE(None, ctypes.c_void_p)),
+  ("extension_data", ctypes.CFUNCTYPE(ctypes.c_void_p, ctypes.c_char_p)),
+]
+
+
+class Plugin(object):
+  """
+  A LV2 plugin instance loaded from a shared object, with the audio ports
+  connected to NumPy ``float32`` buffers. All input ports should come before
+  the output ports, as in the ``ns2metadata`` results.
+
+  Parameters
+  ----------
+  so_fname :
+    Shared object file name.
+  rate :
+    Sample rate for the plugin instance.
+  inputs, outputs :
+    Number of audio input and output ports.
+  block_size :
+    Maximum number of samples in a single ``run`` call.
+  """
+  def __init__(self, so_fname, rate=44100, inputs=1, outputs=1,
+               block_size=256):
+    self.lib = ctypes.CDLL(os.path.abspath(so_fname))
+    get_descriptor = self.lib.lv2_descriptor
+    get_descriptor.argtypes = [ctypes.c_uint32]
+    get_descriptor.restype = ctypes.POINTER(LV2_Descriptor)
+    descriptor = get_descriptor(0)
+    if not descriptor:
+      raise ValueError("No LV2 descriptor in {}".format(so_fname))
+    self.descriptor = descriptor.contents
+    self.uri = self.descriptor.URI.decode("utf-8")
+
+    bundle_path = os.path.dirname(os.path.abspath(so_fname)) + os.sep
+    features = (ctypes.POINTER(LV2_Feature) * 1)() # Only the NULL ending
+    self.handle = self.descriptor.instantiate(descriptor, rate,
+                                              bundle_path.encode("utf-8"),
+                                              features)
+    if not self.handle:
+      raise ValueError("Can't instantiate {} with rate {}"
+                       .format(self.uri, rate))
+
+    self.block_size = block_size
+    self.inputs = [numpy.zeros(block_size, dtype=numpy.float32)
+                   for unused in range(inputs)]
+    self.outputs = [numpy.zeros(block_size, dtype=numpy.float32)
+                    for unused in range(outputs)]
+    for idx, buf in enumerate(self.inputs + self.outputs):
+      self.descriptor.connect_port(self.handle, idx,
+                                   buf.ctypes.data_as(ctypes.c_void_p))
+    self.descriptor.activate(self.handle)
+
+  def run(self, size=None):
+    """ Run the plugin over the data already in the port buffers. """
+    self.descriptor.run(self.handle, self.block_size if size is None
+                                                     else size)
+
+  def process(self, *signals):
+    """
+    Process the given input signals (one per input port), block by block,
+    returning a list of ``float32`` arrays (one per output port).
+    """
+    size = min(len(sig) for sig in signals) if signals else 0
+    results = [numpy.empty(size, dtype=numpy.float32) for el in self.outputs]
+    for start in range(0, size, self.block_size):
+      stop = min(start + self.block_size, size)
+      for buf, sig in zip(self.inputs, signals):
+        buf[:stop - start] = sig[start:stop]
+      self.run(stop - start)
+      for buf, result in zip(self.outputs, results):
+        result[start:stop] = buf[:stop - start]
+    return results
+
+  def connect_inputs(self, buffers):
+    """
+    Connect the input ports to the given buffers (e.g. the outputs of
+    another plugin), instead of the ones created for this instance.
+    """
+    self.inputs = list(buffers)
+    for idx, buf in enumerate(self.inputs):
+      self.descriptor.connect_port(self.handle, idx,
+                                   buf.ctypes.data_as(ctypes.c_void_p))
+
+  def reset(self):
+    """ Clear the plugin state by deactivating and activating it again. """
+    if self.descriptor.deactivate:
+      self.descriptor.deactivate(self.handle)
+    self.descriptor.activate(self.handle)
+
+  def close(self):
+    if self.handle:
+      if self.descriptor.deactivate:
+        self.descriptor.deactivate(self.handle)
+      self.descriptor.cleanup(self.handle)
+      self.handle = None
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    self.close()
+
+
+class PluginChain(Plugin):
+  """
+  Plugin instances in series, like a host would run them: the inputs of each
+  plugin are connected to the outputs of the previous one, and a ``run``
+  calls every plugin ``run`` in order. It has the same interface of a
+  single ``Plugin``, and all the instances are closed together.
+  """
+  def __init__(self, plugins):
+    self.plugins = list(plugins)
+    for previous, plugin in zip(self.plugins, self.plugins[1:]):
+      plugin.connect_inputs(previous.outputs)
+    self.uri = self.plugins[-1].uri
+    self.block_size = min(plugin.block_size for plugin in self.plugins)
+    self.inputs = self.plugins[0].inputs
+    self.outputs = self.plugins[-1].outputs
+
+  def run(self, size=None):
+    for plugin in self.plugins:
+      plugin.run(self.block_size if size is None else size)
+
+  def reset(self):
+    for plugin in self.plugins:
+      plugin.reset()
+
+  def close(self):
+    for plugin in self.plugins:
+      plugin.close()
+
+
+def probe_signals(size=4096, rate=44100, seed=0):
+  """
+  Dictionary with some ``float32`` signals to be used for testing plugins:
+  an unit impulse, a logarithmic sine sweep (20 Hz to 90% of the Nyquist
+  frequency) and an uniform white noise.
+  """
+  impulse = numpy.zeros(size, dtype=numpy.float32)
+  impulse[0] = 1.
+  t = numpy.arange(size) / rate
+  f0, f1 = 20., .45 * rate
+  k = numpy.log(f1 / f0) / (size / rate)
+  sweep = numpy.sin(2 * numpy.pi * f0 * (numpy.exp(k * t) - 1) / k)
+  noise = numpy.random.RandomState(seed).uniform(-1, 1, size)
+  return OrderedDict([
+    ("impulse", impulse),
+    ("sweep", sweep.astype(numpy.float32)),
+    ("noise", noise.astype(numpy.float32)),
+  ])
+
+
+def reference_output(process, signal):
+  """
+  The AudioLazy ``process`` output for the given signal, as a ``float64``
+  array with the same length. The process gets the signal as a Stream.
+  """
+  data = numpy.asarray(signal, dtype=numpy.float64).tolist()
+  return numpy.array(Stream(process(Stream(data))).take(len(data)))
+
+
+def verify(plugin, process, signal, rtol=1e-4, atol=1e-5):
+  """
+  Assert the plugin output matches the AudioLazy ``process`` output (golden
+  output) for a signal, given the tolerances, starting from a cleared plugin
+  state. The ``atol`` is scaled by the reference peak amplitude, when it's
+  greater than one. The infinities and NaN should be in the same samples.
+  Returns the maximum absolute error found in the other samples.
+
+  For multichannel plugins, the signal should be a 2D array with one row per
+  channel, and the ``process`` is applied to each channel.
+  """
+  signals = numpy.atleast_2d(numpy.asarray(signal, dtype=numpy.float32))
+  if len(signals) != len(plugin.inputs):
+    raise ValueError("Needs one signal per input port")
+  plugin.reset()
+  max_error = 0.
+  for result, sig in zip(plugin.process(*signals), signals):
+    if not len(sig):
+      continue
+    expected = reference_output(process, sig)
+    finite = numpy.isfinite(expected) # Infinities and NaN should match
+    peak = max([1.] + numpy.abs(expected[finite]).tolist())
+    numpy.testing.assert_allclose(result, expected, rtol=rtol,
+                                  atol=atol * peak)
+    if finite.any():
+      max_error = max(max_error,
+                      numpy.abs(result[finite] - expected[finite]).max())
+  return max_error
+
+
+def cpu_frequency():
+  """ CPU clock frequency in Hz from ``/proc/cpuinfo``, or None. """
+  try:
+    with open("/proc/cpuinfo") as f:
+      for line in f:
+        if line.startswith("cpu MHz"):
+          return float(line.split(":")[1]) * 1e6
+  except (IOError, OSError, ValueError):
+    pass
+  return None
+
+
+def benchmark(plugin, size=1 << 16, repeat=5, cpu_hz=None):
+  """
+  Time the plugin ``run`` calls (the best of ``repeat`` measurements, each
+  processing ``size`` samples in blocks of ``plugin.block_size`` over noise).
+
+  Returns
+  -------
+  Dictionary with the ``ns_per_sample`` and ``cycles_per_sample`` values,
+  the later using the given ``cpu_hz`` clock frequency, or the one from
+  ``cpu_frequency()``. It's None when the frequency is unknown.
+  """
+  rand = numpy.random.RandomState(0)
+  for buf in plugin.inputs:
+    buf[:] = rand.uniform(-1, 1, len(buf))
+  blocks = max(size // plugin.block_size, 1)
+  def run_blocks():
+    for unused in range(blocks):
+      plugin.run()
+  run_blocks() # Warm up
+  seconds = min(timeit.repeat(run_blocks, repeat=repeat, number=1))
+  ns_per_sample = seconds * 1e9 / (blocks * plugin.block_size)
+  cpu_hz = cpu_hz or cpu_frequency()
+  return {
+    "ns_per_sample": ns_per_sample,
+    "cycles_per_sample": None if cpu_hz is None
+                              else ns_per_sample * cpu_hz * 1e-9,
+  }
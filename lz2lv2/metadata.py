@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Created on Mon 2026-10-19 08:32:41 BRT
+# License is GPLv3, see COPYING.txt for more details.
+# @author: Danilo de Jesus da Silva Bellini
+"""
+lz2lv2 plugin metadata model.
+
+Compact and picklable classes with the plugin metadata, storing plain
+(unquoted) values. The Turtle formatting is done by ``model2metadata``, in
+the core module.
+"""
+
+
+class MetadataItem(object):
+  """
+  Base class for the metadata items. Subclasses should have ``__slots__``
+  with the constructor arguments in the same order.
+  """
+  __slots__ = ()
+
+  def __reduce__(self):
+    return type(self), tuple(getattr(self, k) for k in self.__slots__)
+
+  def __eq__(self, other):
+    return type(self) is type(other) and \
+           self.__reduce__() == other.__reduce__()
+
+  def __ne__(self, other):
+    return not self == other
+
+  def __hash__(self):
+    return hash(self.__reduce__())
+
+  def __repr__(self):
+    return "{}({})".format(type(self).__name__, ", ".join(
+      "{}={!r}".format(k, getattr(self, k)) for k in self.__slots__
+    ))
+
+
+class Person(MetadataItem):
+  """ A developer or maintainer, every attribute is optional. """
+  __slots__ = ("name", "homepage", "email")
+
+  def __init__(self, name=None, homepage=None, email=None):
+    self.name = name
+    self.homepage = homepage
+    self.email = email
+
+
+class License(MetadataItem):
+  """ A license URI (or just its small acronym, like ``GPLv3``). """
+  __slots__ = ("uri",)
+
+  def __init__(self, uri):
+    self.uri = uri
+
+
+class Port(MetadataItem):
+  """
+  A LV2 port, where ``classes`` is a tuple of CURIEs like
+  ``"lv2:AudioPort"``.
+  """
+  __slots__ = ("classes", "index", "symbol", "name")
+
+  def __init__(self, classes, index, symbol, name):
+    self.classes = tuple(classes)
+    self.index = index
+    self.symbol = symbol
+    self.name = name
+
+  @property
+  def is_input(self):
+    return "lv2:InputPort" in self.classes
+
+
+class PluginMetadata(MetadataItem):
+  """
+  The whole metadata for a single plugin URI. The ``classes`` and ``ports``
+  are tuples, the ``developer`` and ``maintainer`` are ``Person`` instances
+  (or None), the ``license`` is a ``License`` instance (or None), and the
+  ``binary`` is the shared object file name, relative to the bundle.
+  """
+  __slots__ = ("uri", "classes", "binary", "ports", "name",
+               "developer", "maintainer", "license", "comment")
+
+  def __init__(self, uri, classes, binary, ports, name, developer=None,
+               maintainer=None, license=None, comment=None):
+    self.uri = uri
+    self.classes = tuple(classes)
+    self.binary = binary
+    self.ports = tuple(ports)
+    self.name = name
+    self.developer = developer
+    self.maintainer = maintainer
+    self.license = license
+    self.comment = comment
+
+  @property
+  def channels(self):
+    """ Number of audio channels, i.e., the number of input ports. """
+    return sum(port.is_input for port in self.ports)
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Created on Mon 2026-10-19 08:54:32 BRT
+# License is GPLv3, see COPYING.txt for more details.
+# @author: Danilo de Jesus da Silva Bellini
+"""
+lz2lv2 multirate processing.
+
+A ``process`` can run at a lower internal rate: the input is decimated,
+processed and interpolated back to the plugin rate, and the generated C
+code uses polyphase FIR filters, computing only the retained samples. In a
+plugin source, the ``decimated`` stage sets the rate dependent values while
+designing the process for the internal rate::
+
+  with decimated(8) as stage:
+    smooth = lowpass(20 * Hz) # Here the rate, s, Hz, ms and kHz are for
+                              # the rate / 8 internal rate
+  process = stage(lambda sig: smooth(abs(sig)))
+"""
+
+from __future__ import division
+
+from audiolazy import Stream, ZFilter, sHz
+import itertools, math
+from .trace import Symbol, TraceError
+
+
+# Default number of anti-aliasing/anti-imaging FIR filter taps per phase
+# (i.e., per decimation factor)
+multirate_taps = 8
+
+
+def rate_values(rate):
+  """
+  Dictionary with the rate dependent values available in the plugin source
+  namespace (the ``rate`` itself, ``s``, ``Hz``, ``ms`` and ``kHz``).
+  """
+  s, Hz = sHz(rate)
+  return {"rate": rate, "s": s, "Hz": Hz, "ms": 1e-3 * s, "kHz": 1e3 * Hz}
+
+
+def lowpass_taps(factor, taps_per_phase=multirate_taps):
+  """
+  Windowed sinc (Hamming) lowpass FIR filter coefficients with the cutoff
+  at the Nyquist frequency of the ``factor`` times lower rate, and unit DC
+  gain.
+  """
+  size = factor * taps_per_phase
+  center = (size - 1) / 2
+  taps = []
+  for n in range(size):
+    t = (n - center) / factor
+    sinc = math.sin(math.pi * t) / (math.pi * t) if t else 1.
+    taps.append(sinc * (.54 - .46 * math.cos(2 * math.pi * n / (size - 1))))
+  gain = sum(taps)
+  return [tap / gain for tap in taps]
+
+
+class Multirate(object):
+  """
+  A ``process`` running at a rate ``factor`` times lower than the plugin
+  rate, between a decimator and an interpolator, both with the ``taps``
+  FIR filter coefficients (the interpolator ones are multiplied by the
+  ``factor``, compensating the zeros between the samples). The ``taps``
+  default to ``lowpass_taps(factor)``.
+
+  Calling it with a Stream is the naive implementation: the whole input is
+  filtered and downsampled (keeping the first sample), the process is
+  applied, and the result is upsampled (with zeros) and filtered.
+  """
+  def __init__(self, process, factor, taps=None):
+    if not isinstance(factor, int) or factor < 2:
+      raise ValueError("Invalid multirate factor: {!r}".format(factor))
+    self.process = process
+    self.factor = factor
+    self.taps = [float(tap) for tap in taps or lowpass_taps(factor)]
+
+  @property
+  def interpolator_taps(self):
+    return [self.factor * tap for tap in self.taps]
+
+  def __call__(self, sig):
+    if isinstance(sig, Symbol):
+      raise TraceError("Unsupported nested multirate stage in a traced "
+                       "process")
+    filtered = ZFilter(self.taps)(Stream(sig))
+    low = self.process(Stream(itertools.islice(filtered, 0, None,
+                                               self.factor)))
+    zeros = [0.] * (self.factor - 1)
+    upsampled = Stream(value for sample in low
+                             for value in itertools.chain([sample], zeros))
+    return ZFilter(self.interpolator_taps)(upsampled)
+
+
+class Decimated(object):
+  """
+  A multirate stage for a plugin source namespace ``ns``, available there
+  as ``decimated(factor, taps=None)``. As a context manager, it replaces the
+  rate dependent values in the namespace (see ``rate_values``) by the ones
+  for the internal rate, restoring them on exit. Calling it with a
+  ``process`` gives the ``Multirate`` instance.
+  """
+  def __init__(self, ns, factor, taps=None):
+    self.ns = ns
+    self.factor = factor
+    self.taps = taps
+    self.saved = []
+
+  def __enter__(self):
+    values = rate_values(self.ns["rate"] / self.factor)
+    self.saved.append(dict((k, self.ns.get(k)) for k in values))
+    self.ns.update(values)
+    return self
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    self.ns.update(self.saved.pop())
+
+  def __call__(self, process):
+    return Multirate(process, self.factor, taps=self.taps)
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Created on Mon 2026-10-19 08:49:03 BRT
+# License is GPLv3, see COPYING.txt for more details.
+# @author: Danilo de Jesus da Silva Bellini
+
+import pytest
+p = pytest.mark.parametrize
+
+from audiolazy import ZFilter, Stream, z, lowpass
+from ..core import ns2model
+from ..codegen import linear_coeffs, ns2kernel
+from ..chain import chain_process, chain_metadata, chain_ns, chain_max_order
+from .test_codegen import plugin_ns
+
+
+def stage_ns(name, process, channels=1, **attrs):
+  return plugin_ns(process, channels, fname=name + ".py", name=name,
+                   uri="http://lz2lv2.test/" + name, doc=name + " docs.",
+                   **attrs)
+
+
+class TestChainProcess(object):
+
+  def test_linear_filters_are_multiplied(self):
+    filt = chain_process([1 - z ** -1, 1 / (1 - .5 * z ** -1)])
+    assert isinstance(filt, ZFilter)
+    assert linear_coeffs(filt) == ([1., -1.], [1., -.5])
+
+  def test_high_order_linear_filters_are_composed(self):
+    stages = [lowpass(.1)] * (chain_max_order + 1)
+    process = chain_process(stages)
+    assert not isinstance(process, ZFilter)
+    data = [.5, -1, 2, 0, 0, 1]
+    expected = Stream(data)
+    for stage in stages:
+      expected = stage(expected)
+    assert list(process(Stream(data)).take(6)) == \
+           pytest.approx(list(expected.take(6)))
+
+  def test_non_linear_stages(self):
+    process = chain_process([lambda sig: 2 * sig, 1 - z ** -1,
+                             lambda sig: sig + 1])
+    assert list(process(Stream([1, 3, 3, 0])).take(4)) == [3, 5, 1, -5]
+
+
+class TestChainMetadata(object):
+
+  def test_merged(self):
+    nss = [stage_ns("first", "z ** -1", 2, lv2class="Delay"),
+           stage_ns("second", "1 - z ** -1", 2,
+                    lv2class=["Filter", "Delay"], license="GPLv3",
+                    author="Someone")]
+    model = ns2model(chain_ns(nss, "/some/path/mychain.py"))
+    assert model.name == "first > second"
+    assert model.uri == "http://lz2lv2.test/first-chain"
+    assert model.binary == "mychain.so"
+    assert model.channels == 2
+    assert model.classes == ("lv2:Plugin", "lv2:DelayPlugin",
+                             "lv2:FilterPlugin")
+    assert model.license.uri == "GPLv3"
+    assert model.developer.name == "Someone"
+    assert model.comment == "first docs.\n\nsecond docs."
+
+  def test_name_and_uri(self):
+    nss = [stage_ns("first", "z ** -1"), stage_ns("second", "z ** -1")]
+    Metadata = chain_metadata(nss, name="Chain", uri="http://lz2lv2.test/c")
+    assert (Metadata.name, Metadata.uri) == ("Chain", "http://lz2lv2.test/c")
+
+  def test_distinct_channels(self):
+    with pytest.raises(ValueError):
+      chain_metadata([stage_ns("first", "z ** -1", 1),
+                      stage_ns("second", "z ** -1", 2)])
+
+
+@p(("processes", "kernel"), [
+  (["1 - z ** -1", "lowpass(.2)"], "dfi"),
+  (["1 - z ** -1", "lambda sig: sig.map(tanh)"], "trace"),
+])
+def test_chain_kernel(processes, kernel):
+  nss = [stage_ns("s{}".format(idx), process)
+         for idx, process in enumerate(processes)]
+  assert ns2kernel(chain_ns(nss, "chain.py"))[0] == kernel
+
+
+def test_multirate_rejected():
+  nss = [stage_ns("first", "z ** -1"),
+         stage_ns("second", "decimated(2)(lambda sig: sig.map(tanh))")]
+  with pytest.raises(ValueError) as exc:
+    chain_ns(nss, "chain.py")
+  assert "second.py" in str(exc.value)
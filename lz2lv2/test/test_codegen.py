@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Created on Mon 2026-10-19 08:35:04 BRT
+# License is GPLv3, see COPYING.txt for more details.
+# @author: Danilo de Jesus da Silva Bellini
+
+import pytest
+p = pytest.mark.parametrize
+
+from ..core import run_source
+from ..codegen import (c_float, linear_coeffs, padded_channels,
+                       default_engine, fir_lines, ns2c, fir_min_taps,
+                       fir_max_taps, dfi_lanes, simplify_filter, multiplies,
+                       ring_size, sparse_lines)
+
+
+def plugin_source(process, channels=1, name="Gen",
+                  uri="http://lz2lv2.test/gen", doc=None, **attrs):
+  """
+  Plugin source code with the given ``process`` (an expression, or the raw
+  code defining it when it starts with ``def`` or ``with``), docstring and
+  extra ``Metadata`` attributes.
+  """
+  raw = process.startswith(("def ", "with "))
+  return "\n".join(['"""{}"""'.format(doc)] * bool(doc) + [
+    "class Metadata:",
+    "  name = {!r}".format(name),
+    "  uri = {!r}".format(uri),
+    "  channels = {}".format(channels),
+  ] + ["  {} = {!r}".format(key, value)
+       for key, value in sorted(attrs.items())] + [
+    process if raw else "process = " + process,
+  ])
+
+
+def plugin_ns(process, channels=1, fname="gen.py", **kwargs):
+  """ Namespace of the ``plugin_source`` with the given arguments. """
+  return run_source(plugin_source(process, channels, **kwargs), fname)
+
+
+class TestLinearCoeffs(object):
+
+  def test_normalized(self):
+    ns = run_source("filt = (2 - z ** -2) / (4 + 2 * z ** -1)", "coeffs.py")
+    assert linear_coeffs(ns["filt"]) == ([.5, 0., -.25], [1., .5])
+
+  def test_non_causal(self):
+    ns = run_source("filt = 1 + z", "coeffs.py")
+    with pytest.raises(ValueError):
+      linear_coeffs(ns["filt"])
+
+  def test_time_variant(self):
+    ns = run_source("filt = 1 + Stream(1, 2) * z ** -1", "coeffs.py")
+    with pytest.raises(TypeError):
+      linear_coeffs(ns["filt"])
+
+
+@p(("value", "expected"), [(1, "1.0"), (-.25, "-0.25"),
+                            (float("inf"), "INFINITY"),
+                            (float("-inf"), "-INFINITY"),
+                            (float("nan"), "NAN")])
+def test_c_float(value, expected):
+  assert c_float(value) == expected
+
+
+class TestSimplifyFilter(object):
+
+  def test_small_coeffs(self):
+    assert simplify_filter([1., 1e-15, 0., 1e-20], [1., 1e-13]) == \
+           ([1.], [1.])
+    assert simplify_filter([1., 1e-3], [1.], tolerance=1e-2) == ([1.], [1.])
+    assert simplify_filter([0., 0.], [1.]) == ([0.], [1.])
+
+  def test_relative_tolerance(self):
+    assert simplify_filter([5e-16], [1., -.99]) == ([5e-16], [1., -.99])
+    assert simplify_filter([1e-15, 1e-20, 1e-28], [1.]) == \
+           ([1e-15, 1e-20], [1.])
+    assert simplify_filter([1e-3, 1e-6], [1.], tolerance=1e-2) == \
+           ([1e-3], [1.])
+
+  def test_pole_zero_cancellation(self):
+    ns = run_source("filt = (1 - .5 * z ** -1) * (1 + z ** -1) / "
+                    "(1 - .5 * z ** -1)", "coeffs.py")
+    b, a = simplify_filter(*linear_coeffs(ns["filt"]))
+    assert b == pytest.approx([1., 1.])
+    assert a == [1.]
+
+  def test_keeps_non_cancelling_filters(self):
+    b, a = [1., .5, .25], [1., -.3]
+    assert simplify_filter(b, a) == (b, a)
+    assert simplify_filter(b, a, cancel_tolerance=.1) == (b, a)
+
+  def test_multiplies(self):
+    assert multiplies([1., 0., 0., .5], [1., 0., -.2]) == 3
+    assert multiplies([0.], [1.]) == 0
+
+
+@p(("channels", "expected"), [(1, 1), (2, 2), (3, 4), (4, 4), (5, 6),
+                              (8, 8), (9, 10), (17, 18)])
+def test_padded_channels(channels, expected):
+  assert padded_channels(channels) == expected
+  assert padded_channels(channels, lanes=dfi_lanes) == expected
+
+
+@p(("channels", "expected"), [(1, 1), (2, 4), (4, 4), (5, 8), (9, 12)])
+def test_padded_channels_wider_lanes(channels, expected):
+  assert padded_channels(channels, lanes=4) == expected
+
+
+class TestEngines(object):
+
+  def test_default_engine(self):
+    fir = [1.] * fir_min_taps
+    assert default_engine(fir, [1.]) == "fir"
+    assert default_engine([1.] * fir_max_taps, [1.]) == "fir"
+    assert default_engine(fir[1:], [1.]) == "dfi"
+    assert default_engine([1.] * (fir_max_taps + 1), [1.]) == "dfi"
+    assert default_engine(fir, [1., .5]) == "dfi"
+    assert default_engine(fir, [1.], channels=2) == "dfi"
+
+  def test_default_sparse_engine(self):
+    comb = [1.] + [0.] * 63 + [-.5]
+    assert default_engine([1.], comb) == "sparse"
+    assert default_engine([1.], comb, channels=3) == "dfi"
+    assert default_engine([0.] * 5 + [1.], [1.]) == "sparse"
+    assert default_engine([1., 0., 1.], [1.]) == "dfi"
+    assert default_engine([1., 1., 0., 1.], [1.]) == "dfi"
+
+  def test_sparse_lines(self):
+    assert ring_size([1]) == 2
+    assert ring_size([3, 4]) == 8
+    code = "\n".join(sparse_lines([1., 0., 0., .5], [1.] + [0.] * 9 + [.2]))
+    assert "xs[(p - 3) & 3]" in code
+    assert "ys[(p - 10) & 15]" in code
+    assert "(p - 1)" not in code and "(p - 2)" not in code
+
+  @p(("b", "a", "channels"), [([1.] * 9, [1., .2], 1),
+                              ([1.] * 9, [1.], 2)])
+  def test_fir_engine_restrictions(self, b, a, channels):
+    with pytest.raises(ValueError):
+      fir_lines(b, a, channels)
+
+  def test_ns2c_engine_choice(self):
+    assert "hist" in ns2c(plugin_ns("ZFilter([1] * 20)"))
+    assert "hist" not in ns2c(plugin_ns("ZFilter([1] * 20)"), engine="dfi")
+    assert "hist" not in ns2c(plugin_ns("ZFilter([1] * 20)", channels=2))
+
+  @p("process", ["'text'", "[1, 2]"])
+  def test_ns2c_rejects_non_callable(self, process):
+    with pytest.raises(TypeError):
+      ns2c(plugin_ns(process))
+
+  def test_ns2c_simplifies(self, caplog):
+    caplog.set_level("INFO", logger="lz2lv2.codegen")
+    process = "(1 - .5 * z ** -1) * (1 + z ** -1) / (1 - .5 * z ** -1)"
+    c_code = ns2c(plugin_ns(process))
+    assert "self->y" not in c_code # No feedback after the cancellation
+    assert "2 multiplies per sample (4 before simplifying)" in caplog.text
+    assert "self->y" in ns2c(plugin_ns(process), tolerance=None)
+    ns2c(plugin_ns("comb(64, .5)"))
+    assert "2 multiplies per sample (2 before simplifying)" in caplog.text
+
+  def test_ns2c_traced_simplifies(self, caplog):
+    caplog.set_level("INFO", logger="lz2lv2.trace")
+    process = "(1 - .5 * z ** -1) * (1 + z ** -1) / (1 - .5 * z ** -1)"
+    ns2c(plugin_ns("lambda sig: ({})(sig).map(tanh)".format(process)))
+    assert "Traced filter f1: 2 multiplies per sample (4 before " \
+           "simplifying)" in caplog.text
+
+  def test_ns2c_traced(self):
+    c_code = ns2c(plugin_ns("lambda sig: .5 * sig + lowpass(.1)(sig)", 2))
+    assert "double f" in c_code # Filter state
+    with pytest.raises(ValueError):
+      ns2c(plugin_ns("lambda sig: sig"), engine="dfi")
+
+  @p("process", ["lambda sig: lowpass(.1)(sig).map(tanh)",
+                 "decimated(2)(lambda sig: lowpass(.1)(sig).map(tanh))"])
+  def test_ns2c_traced_filter_pointers(self, process):
+    c_code = ns2c(plugin_ns(process))
+    assert "double *f1_y" in c_code
+    assert "f1_x" not in c_code.split("run(")[1] # Pure feedback
+
+  def test_ns2c_constant_output(self):
+    c_code = ns2c(plugin_ns("lambda sig: .25"))
+    assert "*in" not in c_code.split("run(")[1]
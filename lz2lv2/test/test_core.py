@@ -10,7 +10,9 @@ p = pytest.mark.parametrize
 import audiolazy, types, operator
 from collections import OrderedDict
 from ..core import (run_source, ns2metadata, metadata2ttl, ttl_tokens,
-                    ttl_single_uri_data, get_prefixes)
+                    ttl_single_uri_data, get_prefixes, ns2model,
+                    model2metadata, metadata2model, ttl_unquote)
+from ..metadata import PluginMetadata
 
 
 class TestRunSource(object):
@@ -241,6 +243,93 @@ class TestNS2Metadata(object):
     assert mdata["a"] == ["lv2:Plugin", "lv2:FilterPlugin",
                           "lv2:EQPlugin", "lv2:MultiEQPlugin"]
 
+  @p("channels", [1, 2, 5])
+  def test_channels(self, channels):
+    class Metadata:
+      name = "Multi"
+      uri = "http://many.channels/here"
+    Metadata.channels = channels
+    mdata = self.mdata_basics_tested(Metadata, "multi.py",
+                                     inputs=channels, outputs=channels)
+    symbols = [port["lv2:symbol"] for port in mdata["lv2:port"]]
+    if channels == 1:
+      assert symbols == [['"In"'], ['"Out"']]
+    else:
+      assert symbols == [['"{}{}"'.format(direction, idx)]
+                         for direction in ["In", "Out"]
+                         for idx in range(1, channels + 1)]
+      assert mdata["lv2:port"][1]["lv2:name"] == ['"In 2"']
+
+  @p("channels", [0, -1, 1.5, "2"])
+  def test_invalid_channels(self, channels):
+    class Metadata:
+      name = "Invalid"
+      uri = "http://no.channels/here"
+    Metadata.channels = channels
+    with pytest.raises(ValueError):
+      ns2metadata(dict(Metadata=Metadata, __file__="invalid.py"))
+
+
+class TestModel(object):
+
+  src = "\n".join([
+    '"""',
+    'A docstring',
+    '"""',
+    "class Metadata:",
+    "  name = 'Modeled'",
+    "  uri = 'http://some.model/here'",
+    "  author = 'Someone'",
+    "  author_email = 'some@one.net'",
+    "  license = 'GPLv3'",
+    "  lv2class = 'Filter', 'Lowpass'",
+    "  channels = 2",
+  ])
+
+  def test_ns2model(self):
+    model = ns2model(run_source(self.src, "/a/modeled.py"))
+    assert isinstance(model, PluginMetadata)
+    assert model.uri == "http://some.model/here"
+    assert model.classes == ("lv2:Plugin", "lv2:FilterPlugin",
+                             "lv2:LowpassPlugin")
+    assert model.binary == "modeled.so"
+    assert [port.symbol for port in model.ports] == \
+           ["In1", "In2", "Out1", "Out2"]
+    assert model.name == "Modeled" # Unquoted
+    assert model.developer is model.maintainer
+    assert model.developer.name == "Someone"
+    assert model.developer.homepage is None
+    assert model.developer.email == "some@one.net" # No "mailto:"
+    assert model.license.uri == "GPLv3"
+    assert model.comment == "\nA docstring\n"
+    assert model.channels == 2
+
+  def test_dict_round_trip(self):
+    ns = run_source(self.src, "/a/modeled.py")
+    model = ns2model(ns)
+    mdata = model2metadata(model)
+    assert mdata == ns2metadata(ns)
+    assert mdata.uri == model.uri
+    result = metadata2model(mdata)
+    assert result == model
+    assert result.developer is result.maintainer
+
+  def test_metadata2ttl(self):
+    ns = run_source(self.src, "/a/modeled.py")
+    assert metadata2ttl(ns2model(ns)) == metadata2ttl(ns2metadata(ns))
+
+  @p(("token", "expected"), [
+    ('"abc"', "abc"),
+    ('"""a\nb"""', "a\nb"),
+    ('""', ""),
+    ('""""""', ""),
+    ("<mailto:a@b.c>", "mailto:a@b.c"),
+    ("lv2:Plugin", "lv2:Plugin"),
+    ('"', '"'),
+  ])
+  def test_ttl_unquote(self, token, expected):
+    assert ttl_unquote(token) == expected
+
 
 @p("extra_space", [True, False, None])
 class TestMetadata2TTL(object):
@@ -290,6 +379,24 @@ class TestMetadata2TTL(object):
     kwargs = {} if extra_space is None else {"extra_space": extra_space}
     assert expected == metadata2ttl(ns2metadata(ns), **kwargs)
 
+  def test_cost(self, extra_space):
+    mdata = ns2metadata(run_source(self.src, self.fname))
+    prefixes = self.expected_prefixes + [
+      "@prefix lz2lv2: <http://github.com/danilobellini/lz2lv2#>."
+    ]
+    exp_code = "\n".join([
+      "",
+      self.expected_code[:-1] + ";\n",
+      "  lz2lv2:nsPerSample 12.346.",
+    ])
+    if extra_space is False:
+      exp_code = exp_code.replace("\n\n", "\n")
+    expected = "\n".join(prefixes + [exp_code])
+
+    kwargs = {} if extra_space is None else {"extra_space": extra_space}
+    assert expected == metadata2ttl(mdata, cost=12.3456, **kwargs)
+    assert "lz2lv2" not in metadata2ttl(mdata, **kwargs) # Unchanged
+
   def test_class_with_name_uri_and_docstring(self, extra_space):
     docstring = "\n".join(['"""',
                            'this is a',
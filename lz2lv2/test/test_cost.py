@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Created on Mon 2026-10-19 08:46:20 BRT
+# License is GPLv3, see COPYING.txt for more details.
+# @author: Danilo de Jesus da Silva Bellini
+
+import pytest
+p = pytest.mark.parametrize
+
+from .test_codegen import plugin_ns
+from ..cost import (estimate_cost, check_budget, BudgetError, dfi_ops,
+                    sparse_ops, weighted_ops, load_calibration,
+                    save_calibration, default_calibration)
+from ..codegen import padded_channels, dfi_lanes
+
+
+class TestOps(object):
+
+  def test_dfi(self):
+    ops = dfi_ops([1., 0., .5], [1., -.2])
+    assert ops["multiplies"] == 3
+    assert ops["adds"] == 2
+    assert ops["memory"] == 2 + 2 + 2 * 3 # Ports, state loads, shifts
+    assert weighted_ops(ops) == 3 + 2 + .5 * 10
+
+  def test_sparse_cheaper_than_dfi(self):
+    comb = [1.] + [0.] * 63 + [-.5]
+    assert sparse_ops([1.], comb)["multiplies"] == 2
+    assert weighted_ops(sparse_ops([1.], comb)) < \
+           weighted_ops(dfi_ops([1.], comb))
+
+  def test_zero_filter(self):
+    assert weighted_ops(dfi_ops([], [1.])) == 1.
+
+
+class TestEstimateCost(object):
+
+  @p(("process", "engine"), [
+    ("1 - z ** -1", "dfi"),
+    ("ZFilter([1] * 20)", "fir"),
+    ("comb(64, .5)", "sparse"),
+    ("lambda sig: sig.map(tanh) * .5", "trace"),
+    ("decimated(4)(lambda sig: sig.map(tanh))", "multirate"),
+  ])
+  def test_kernels(self, process, engine):
+    cost = estimate_cost(plugin_ns(process))
+    assert cost["uri"] == "http://lz2lv2.test/gen"
+    assert cost["engine"] == engine
+    assert cost["ops"] > 0
+    assert cost["ns_per_sample"] > 0
+
+  def test_increases_with_size_and_channels(self):
+    small, large = [estimate_cost(plugin_ns("ZFilter([1] * {})".format(n)))
+                    for n in [20, 200]]
+    assert small["ns_per_sample"] < large["ns_per_sample"]
+    stereo = estimate_cost(plugin_ns("ZFilter([1] * 20)", channels=2))
+    assert stereo["channels"] == 2
+    assert stereo["ns_per_sample"] > small["ns_per_sample"]
+
+  @p("channels", [2, 5, 8])
+  def test_interleaved_channels(self, channels):
+    mono, multi = [estimate_cost(plugin_ns("1 / (1 - .3 * z ** -3)", nch),
+                                 engine="dfi")
+                   for nch in [1, channels]]
+    assert multi["ns_per_sample"] == \
+           mono["ns_per_sample"] * padded_channels(channels) / dfi_lanes
+    assert multi["ns_per_sample"] < mono["ns_per_sample"] * channels
+
+  def test_engine_and_calibration(self):
+    ns = plugin_ns("ZFilter([1] * 20)")
+    assert estimate_cost(ns, engine="dfi")["engine"] == "dfi"
+    calibration = dict(default_calibration, fir=(1., 0.))
+    assert estimate_cost(ns, calibration=calibration)["ns_per_sample"] == 1.
+
+  def test_budget(self):
+    cost = estimate_cost(plugin_ns("ZFilter([1] * 200)", channels=4))
+    check_budget(cost, None)
+    check_budget(cost, cost["ns_per_sample"])
+    with pytest.raises(BudgetError) as exc:
+      check_budget(cost, cost["ns_per_sample"] / 2)
+    assert "http://lz2lv2.test/gen" in str(exc.value)
+
+
+def test_calibration_file(tmpdir):
+  fname = str(tmpdir.join("calibration.json"))
+  save_calibration(default_calibration, fname)
+  assert load_calibration(fname) == default_calibration
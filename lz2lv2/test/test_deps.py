@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Created on Mon 2026-10-19 08:31:28 BRT
+# License is GPLv3, see COPYING.txt for more details.
+# @author: Danilo de Jesus da Silva Bellini
+
+import pytest
+p = pytest.mark.parametrize
+
+import os, shutil, itertools
+from ..core import run_source
+from .test_codegen import plugin_source
+from ..build import find_compiler
+from ..deps import (imported_modules, resolve_name, transitive_deps,
+                    track_imports, build_incremental, DepsState)
+
+needs_cc = pytest.mark.skipif(not find_compiler(),
+                              reason="No C compiler available")
+
+# Unique helper module names, as modules are cached by the interpreter
+helper_names = ("lz2lv2_test_helper{}".format(idx)
+                for idx in itertools.count())
+
+
+def helper_plugin_source(helper, name):
+  """ Plugin source whose ``process`` is designed by a helper module. """
+  return "from {} import design\n".format(helper) + plugin_source(
+    "design()", name=name, uri="http://lz2lv2.test/" + name
+  )
+
+
+class TestImportedModules(object):
+
+  def test_absolute(self):
+    assert imported_modules("a", {}, None, 0) == ["a"]
+    assert imported_modules("a.b.c", {}, (), 0) == ["a", "a.b", "a.b.c"]
+
+  def test_fromlist(self):
+    assert imported_modules("a", {}, ("b", "c"), 0) == ["a", "a.b", "a.c"]
+    assert imported_modules("a.b", {}, ("*",), 0) == ["a", "a.b"]
+
+  def test_relative(self):
+    glb = {"__package__": "pkg.sub"}
+    assert imported_modules("mod", glb, None, 1) == \
+           ["pkg", "pkg.sub", "pkg.sub.mod"]
+    assert imported_modules("", glb, ("mod",), 2) == ["pkg", "pkg.mod"]
+
+
+class TestResolveName(object):
+
+  def test_levels(self):
+    assert resolve_name("mod", "pkg.sub", 1) == "pkg.sub.mod"
+    assert resolve_name("mod", "pkg.sub", 2) == "pkg.mod"
+    assert resolve_name("", "pkg.sub", 2) == "pkg"
+    assert resolve_name("a.b", "pkg", 1) == "pkg.a.b"
+
+  def test_beyond_top_level(self):
+    with pytest.raises(ImportError):
+      resolve_name("mod", "pkg", 2)
+
+
+class TestTransitiveDeps(object):
+
+  def test_chain_and_cycle(self):
+    graph = {"a": ["b"], "b": ["c", "a"], "d": ["a"]}
+    assert transitive_deps(graph, "a") == {"a", "b", "c"}
+    assert transitive_deps(graph, "d") == {"a", "b", "c", "d"}
+    assert transitive_deps(graph, "c") == {"c"}
+    assert transitive_deps({}, "x") == {"x"}
+
+
+class TestTrackImports(object):
+
+  def test_plugin_and_helper_imports(self, tmpdir, monkeypatch):
+    monkeypatch.syspath_prepend(str(tmpdir))
+    helper, inner = next(helper_names), next(helper_names)
+    tmpdir.join(inner + ".py").write("gain = .5\n")
+    tmpdir.join(helper + ".py").write("\n".join([
+      "import os, audiolazy",
+      "from {} import gain".format(inner),
+      "def design():",
+      "  return gain * audiolazy.z ** -1",
+    ]))
+    fname = os.path.realpath(str(tmpdir.join("plugin.py")))
+    src = helper_plugin_source(helper, "tracked")
+    with track_imports() as graph:
+      run_source(src, fname)
+    helper_fname = os.path.realpath(str(tmpdir.join(helper + ".py")))
+    inner_fname = os.path.realpath(str(tmpdir.join(inner + ".py")))
+    assert graph[fname] == {helper_fname}
+    assert graph[helper_fname] == {inner_fname} # No stdlib nor audiolazy
+    assert transitive_deps(graph, fname) == {fname, helper_fname,
+                                             inner_fname}
+
+
+@needs_cc
+@p("jobs", [1, 2])
+def test_build_incremental(tmpdir, monkeypatch, jobs):
+  monkeypatch.syspath_prepend(str(tmpdir))
+  helpers = [next(helper_names) for unused in range(2)]
+  for helper in helpers:
+    tmpdir.join(helper + ".py").write("\n".join([
+      "from audiolazy import z",
+      "def design():",
+      "  return 1 - z ** -1",
+    ]))
+  fnames = []
+  for idx, helper in enumerate([helpers[0], helpers[0], helpers[1]]):
+    fname = str(tmpdir.join("plugin{}.py".format(idx)))
+    with open(fname, "w") as f:
+      f.write(helper_plugin_source(helper, "p{}".format(idx)))
+    fnames.append(fname)
+  state_fname = str(tmpdir.join("deps.json"))
+
+  # First build has everything, the second has nothing
+  results = build_incremental(fnames, state_fname, jobs=jobs)
+  assert sorted(results) == fnames
+  assert all(os.path.isfile(so_fname) for so_fname in results.values())
+  assert build_incremental(fnames, state_fname, jobs=jobs) == {}
+
+  # Changing a helper rebuilds just the plugins that depends on it
+  tmpdir.join(helpers[0] + ".py").write("\n".join([
+    "from audiolazy import z",
+    "def design():",
+    "  return 1 + z ** -1",
+  ]))
+  results = build_incremental(fnames, state_fname, jobs=jobs)
+  assert sorted(results) == fnames[:2]
+  with open(os.path.splitext(fnames[0])[0] + ".lv2/plugin0.c") as f:
+    c_code = f.read()
+  assert "1.0 * self->x[0]" in c_code
+  assert "-1.0 * self->x[0]" not in c_code
+
+  # Changing a plugin rebuilds just itself, removing a bundle as well
+  with open(fnames[2], "a") as f:
+    f.write("\n# Changed\n")
+  shutil.rmtree(os.path.splitext(fnames[1])[0] + ".lv2")
+  results = build_incremental(fnames, state_fname, jobs=jobs)
+  assert sorted(results) == fnames[1:]
+
+  state = DepsState(state_fname)
+  helper_fname = os.path.realpath(str(tmpdir.join(helpers[1] + ".py")))
+  assert state.graph[os.path.realpath(fnames[2])] == [helper_fname]
+  assert sorted(state.plugins[os.path.realpath(fnames[2])]["hashes"]) == \
+         sorted([os.path.realpath(fnames[2]), helper_fname])
+
+
+@needs_cc
+def test_build_incremental_subset(tmpdir, monkeypatch):
+  monkeypatch.syspath_prepend(str(tmpdir))
+  helper = next(helper_names)
+  helper_fname = str(tmpdir.join(helper + ".py"))
+  def write_helper(sign):
+    with open(helper_fname, "w") as f:
+      f.write("\n".join([
+        "from audiolazy import z",
+        "def design():",
+        "  return 1 {} z ** -1".format(sign),
+      ]))
+  write_helper("-")
+  fnames = []
+  for idx in range(2):
+    fname = str(tmpdir.join("plugin{}.py".format(idx)))
+    with open(fname, "w") as f:
+      f.write(helper_plugin_source(helper, "p{}".format(idx)))
+    fnames.append(fname)
+  state_fname = str(tmpdir.join("deps.json"))
+  assert sorted(build_incremental(fnames, state_fname, jobs=1)) == fnames
+
+  # A build with just a subset of the plugins sharing the changed helper
+  # shouldn't make the other ones look up to date
+  write_helper("+")
+  assert sorted(build_incremental(fnames[:1], state_fname, jobs=1)) == \
+         fnames[:1]
+  assert sorted(build_incremental(fnames, state_fname, jobs=1)) == \
+         fnames[1:]
+  with open(os.path.splitext(fnames[1])[0] + ".lv2/plugin1.c") as f:
+    assert "-1.0 * self->x[0]" not in f.read()
+  assert build_incremental(fnames, state_fname, jobs=1) == {}
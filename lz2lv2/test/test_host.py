@@ -0,0 +1,301 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Created on Mon 2026-10-19 08:29:19 BRT
+# License is GPLv3, see COPYING.txt for more details.
+# @author: Danilo de Jesus da Silva Bellini
+"""
+Module for testing compiled plugins against their AudioLazy process.
+"""
+
+import pytest
+p = pytest.mark.parametrize
+
+import os
+numpy = pytest.importorskip("numpy")
+from ..core import run_source
+from ..build import build_bundle, find_compiler
+from ..cost import BudgetError, default_calibration
+from ..host import (Plugin, PluginChain, probe_signals, reference_output,
+                    verify, benchmark)
+from ..bench import (bench_channels, bench_chain, bench_multirate,
+                     calibrate)
+from ..chain import build_chain
+from .test_diff import diff_fname
+from .test_codegen import plugin_source
+
+if not find_compiler():
+  pytest.skip("No C compiler available", allow_module_level=True)
+
+
+def write_test_plugin(fname, process, channels=1):
+  """ Write the plugin source for a ``process`` in the given file. """
+  with open(fname, "w") as f:
+    f.write(plugin_source(process, channels, name="Test",
+                          uri="http://lz2lv2.test/plugin",
+                          doc="Testing plugin."))
+
+
+processes = [
+  "1 - z ** -1",
+  "1 / (1 - .3 * z ** -3)",
+  "(1 + 2 * z ** -1 + z ** -2) / (4 - 2 * z ** -1 + .5 * z ** -2)",
+  "lowpass(1 * kHz)",
+  "resonator(440 * Hz, 30 * Hz)",
+  "comb(64, .5)",
+  "ZFilter(1)",
+  "ZFilter(0)",
+]
+
+
+def build_test_plugin(tmpdir, process, rate, channels=1, engine=None):
+  fname = str(tmpdir.join("plugin.py"))
+  write_test_plugin(fname, process, channels)
+  so_fname = build_bundle(fname, str(tmpdir.join("bundle")), rate=rate,
+                          engine=engine)
+  with open(fname) as f:
+    ns = run_source(f.read(), fname, rate=rate or 1)
+  return so_fname, ns
+
+
+@p("process", processes)
+@p("block_size", [1, 64, 256])
+def test_golden_output(tmpdir, process, block_size):
+  rate = 44100
+  so_fname, ns = build_test_plugin(tmpdir, process, rate)
+  with Plugin(so_fname, rate=rate, block_size=block_size) as plugin:
+    assert plugin.uri == "http://lz2lv2.test/plugin"
+    for name, signal in probe_signals(size=2048, rate=rate).items():
+      verify(plugin, ns["process"], signal)
+
+
+@p("process", processes[:5])
+@p("channels", [2, 3, 8, 9])
+def test_multichannel_golden_output(tmpdir, process, channels):
+  rate = 44100
+  so_fname, ns = build_test_plugin(tmpdir, process, rate, channels)
+  signals = list(probe_signals(size=1024, rate=rate).values())
+  channel_signals = numpy.array([signals[idx % len(signals)] * (1 + idx)
+                                 for idx in range(channels)])
+  with Plugin(so_fname, rate=rate, inputs=channels, outputs=channels,
+              block_size=100) as plugin:
+    verify(plugin, ns["process"], channel_signals)
+
+
+@p("process", [
+  "lowpass(20 * Hz) ** 6",
+  "lowpass(5 * Hz) ** 4",
+])
+def test_narrow_lowpass_golden_output(tmpdir, process):
+  rate = 44100
+  so_fname, ns = build_test_plugin(tmpdir, process, rate)
+  step = numpy.ones(rate // 2, dtype=numpy.float32)
+  with Plugin(so_fname, rate=rate, block_size=256) as plugin:
+    verify(plugin, ns["process"], step)
+    assert numpy.abs(plugin.process(step)[0]).max() > .1 # Not silence
+
+
+@p("process", [
+  "ZFilter([1 / (k + 1) for k in range(8)])",
+  "ZFilter([(-1) ** k / (k + 1) for k in range(37)])",
+  "ZFilter([.01] * 300)",
+  "z ** -5",
+  "1 - z ** -1",
+])
+@p("engine", ["dfi", "fir"])
+@p("block_size", [1, 13, 1000])
+def test_fir_engines(tmpdir, process, engine, block_size):
+  so_fname, ns = build_test_plugin(tmpdir, process, None, engine=engine)
+  with Plugin(so_fname, block_size=block_size) as plugin:
+    for name, signal in probe_signals(size=3000).items():
+      verify(plugin, ns["process"], signal)
+
+
+@p("process", [
+  "comb(64, .5)",
+  "z ** -5",
+  "1 - .5 * z ** -100",
+  "(1 + z ** -8) / (1 - .25 * z ** -16)",
+  "(1 - .5 * z ** -1) * (1 + z ** -1) / (1 - .5 * z ** -1)",
+])
+@p("channels", [1, 3])
+@p("block_size", [1, 13, 1000])
+def test_sparse_engine(tmpdir, process, channels, block_size):
+  so_fname, ns = build_test_plugin(tmpdir, process, None, channels,
+                                   engine="sparse")
+  signals = list(probe_signals(size=3000).values())
+  with Plugin(so_fname, inputs=channels, outputs=channels,
+              block_size=block_size) as plugin:
+    for idx, signal in enumerate(signals):
+      verify(plugin, ns["process"], [signals[(idx + ch) % len(signals)]
+                                     for ch in range(channels)])
+
+
+@p("design", [
+  "process = stage(lowpass(1 * kHz))",
+  "smooth = lowpass(20 * Hz)\n"
+  "process = stage(lambda sig: smooth(abs(sig)).map(sqrt))",
+  "process = stage(lambda sig: sig.map(tanh) * .5)",
+])
+@p(("factor", "channels"), [(2, 1), (3, 2), (4, 1), (8, 3)])
+@p("block_size", [1, 13, 1000])
+def test_multirate_golden_output(tmpdir, design, factor, channels,
+                                 block_size):
+  rate = 44100
+  code = "\n".join(["with decimated({}) as stage:".format(factor)] +
+                   ["  " + line for line in design.splitlines()])
+  so_fname, ns = build_test_plugin(tmpdir, code, rate, channels)
+  signals = list(probe_signals(size=2000, rate=rate).values())
+  with Plugin(so_fname, rate=rate, inputs=channels, outputs=channels,
+              block_size=block_size) as plugin:
+    for idx, signal in enumerate(signals):
+      verify(plugin, ns["process"], [signals[(idx + ch) % len(signals)]
+                                     for ch in range(channels)])
+
+
+@p("process", [
+  "lambda sig: .5 * sig",
+  "lambda sig: sig.map(tanh)",
+  "lambda sig: (3 * sig).map(lambda x: x / (1 + abs(x)))",
+  "\n".join(["def process(sig):",
+             "  sig = thub(sig, 2)",
+             "  return sig * lowpass(1 * kHz)(sig) + .1"]),
+  "\n".join(["def process(sig):",
+             "  sig = thub(sig, 2)",
+             "  return resonator(440 * Hz, 30 * Hz)(sig).map(sin) - \\",
+             "         sig ** 2"]),
+  "lambda sig: CascadeFilter(lowpass(2 * kHz), highpass(100 * Hz))(sig)",
+  "lambda sig: .25",
+  "lambda sig: (sig * 0).map(log)",
+  "lambda sig: sig + float('inf')",
+  "\n".join(["def process(sig):",
+             "  sig = thub(sig, 3)",
+             "  return (1.5 + sig.map(tanh)).map(log10) + \\",
+             "         (1 + sig * sig).map(ln)"]),
+  "\n".join(["def process(sig):",
+             "  sig = thub(sig, 2)",
+             "  filt = (1 + z ** -2) * (1 - .9 * z ** -1)",
+             "  filt /= 1 - .9 * z ** -1",
+             "  return sig - filt(sig)"]),
+])
+@p("channels", [1, 2])
+def test_traced_golden_output(tmpdir, process, channels):
+  rate = 44100
+  so_fname, ns = build_test_plugin(tmpdir, process, rate, channels)
+  signals = list(probe_signals(size=1024, rate=rate).values())
+  with Plugin(so_fname, rate=rate, inputs=channels, outputs=channels,
+              block_size=100) as plugin:
+    for idx, signal in enumerate(signals):
+      verify(plugin, ns["process"], [signals[(idx + ch) % len(signals)]
+                                     for ch in range(channels)])
+
+
+def test_diff_example(tmpdir):
+  so_fname = build_bundle(diff_fname, str(tmpdir))
+  assert os.path.isfile(str(tmpdir.join("manifest.ttl")))
+  assert os.path.basename(so_fname) == "diff.so"
+  with Plugin(so_fname, rate=48000) as plugin:
+    result = plugin.process(numpy.array([1, 5, 2, 2, -1]))[0]
+  assert result.tolist() == [1, 4, -3, 0, -3]
+
+
+def test_rate_mismatch(tmpdir):
+  so_fname, ns = build_test_plugin(tmpdir, "lowpass(1 * kHz)", 44100)
+  with pytest.raises(ValueError):
+    Plugin(so_fname, rate=48000)
+
+
+def test_state_persists_between_blocks(tmpdir):
+  so_fname, ns = build_test_plugin(tmpdir, "1 / (1 - .5 * z ** -1)", None)
+  with Plugin(so_fname, block_size=3) as plugin:
+    result = plugin.process(numpy.array([1., 0, 0, 0, 0, 0, 0]))[0]
+  assert result.tolist() == [.5 ** idx for idx in range(7)]
+
+
+def test_reference_output():
+  ns = run_source("process = 1 - z ** -1", "ref.py")
+  assert reference_output(ns["process"], [3, 2, 2]).tolist() == [3, -1, 0]
+
+
+def test_benchmark(tmpdir):
+  so_fname = build_bundle(diff_fname, str(tmpdir))
+  with Plugin(so_fname) as plugin:
+    result = benchmark(plugin, size=1024, repeat=1, cpu_hz=1e9)
+  assert result["ns_per_sample"] > 0
+  assert result["cycles_per_sample"] == pytest.approx(result["ns_per_sample"])
+
+
+def test_bench_channels():
+  results = bench_channels(channels=[2, 8], size=256, repeat=1)
+  assert [row["channels"] for row in results] == [2, 8]
+  assert all(row["engine"] == "dfi" for row in results) # Interleaved
+  assert all(row["speedup"] > 0 for row in results)
+
+
+def test_calibrate():
+  calibration = calibrate(size=256, repeat=1)
+  assert sorted(calibration) == sorted(default_calibration)
+  assert all(base >= 0 and slope >= 0
+             for base, slope in calibration.values())
+
+
+def test_budget_and_ttl_cost(tmpdir):
+  fname = str(tmpdir.join("plugin.py"))
+  write_test_plugin(fname, "ZFilter([1] * 300)")
+  bundle_dir = str(tmpdir.join("bundle"))
+  with pytest.raises(BudgetError):
+    build_bundle(fname, bundle_dir, budget=1.)
+  assert not os.path.exists(bundle_dir)
+  build_bundle(fname, bundle_dir, budget=1e3, ttl_cost=True)
+  with open(os.path.join(bundle_dir, "manifest.ttl")) as f:
+    assert "lz2lv2:nsPerSample" in f.read()
+
+
+@p("stages", [
+  ["lowpass(5 * kHz)", "highpass(80 * Hz)", "1 - .5 * z ** -1"],
+  ["lowpass(5 * kHz)", "lambda sig: sig.map(tanh)",
+   "resonator(440 * Hz, 100 * Hz)"],
+  ["resonator(440 * Hz, 100 * Hz)"] * 5,
+  ["lowpass(5 * Hz)"] * 4,
+])
+@p("channels", [1, 2])
+def test_fused_chain(tmpdir, stages, channels):
+  rate = 44100
+  fnames, so_fnames = [], []
+  for idx, process in enumerate(stages):
+    fname = str(tmpdir.join("stage{}.py".format(idx)))
+    write_test_plugin(fname, process, channels)
+    fnames.append(fname)
+    so_fnames.append(build_bundle(fname, str(tmpdir.join(
+      "stage{}.lv2".format(idx)
+    )), rate=rate))
+  fused_so = build_chain(fnames, str(tmpdir.join("fused.lv2")), rate=rate)
+  assert os.path.isfile(str(tmpdir.join("fused.lv2", "manifest.ttl")))
+
+  signals = list(probe_signals(size=1024, rate=rate).values())
+  signals = [[signals[(idx + ch) % len(signals)] for ch in range(channels)]
+             for idx in range(len(signals))]
+  with Plugin(fused_so, rate=rate, inputs=channels, outputs=channels,
+              block_size=100) as fused:
+    with PluginChain(Plugin(so_fname, rate=rate, inputs=channels,
+                            outputs=channels, block_size=100)
+                     for so_fname in so_fnames) as separate:
+      for signal in signals:
+        fused.reset()
+        separate.reset()
+        for fused_out, separate_out in zip(fused.process(*signal),
+                                           separate.process(*signal)):
+          assert fused_out == pytest.approx(separate_out, rel=1e-4,
+                                            abs=1e-5)
+
+
+def test_bench_chain():
+  result = bench_chain(["lowpass(5 * kHz)", "lambda sig: sig.map(tanh)"],
+                       size=256, repeat=1)
+  assert result["stages"] == 2
+  assert result["speedup"] > 0
+
+
+def test_bench_multirate():
+  results = bench_multirate(factors=[4], size=256, repeat=1)
+  assert [row["factor"] for row in results] == [4]
+  assert all(row["speedup"] > 0 for row in results)
@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Created on Mon 2026-10-19 08:33:04 BRT
+# License is GPLv3, see COPYING.txt for more details.
+# @author: Danilo de Jesus da Silva Bellini
+
+import pytest
+p = pytest.mark.parametrize
+
+import pickle
+from ..metadata import PluginMetadata, Port, Person, License
+
+
+author = Person("Someone", "http://some.where", "some@one.net")
+
+model = PluginMetadata(
+  uri = "http://some.where/plugin",
+  classes = ["lv2:Plugin", "lv2:FilterPlugin"],
+  binary = "plugin.so",
+  ports = [Port(["lv2:AudioPort", "lv2:InputPort"], 0, "In", "In"),
+           Port(["lv2:AudioPort", "lv2:OutputPort"], 1, "Out", "Out")],
+  name = "Plugin",
+  developer = author,
+  maintainer = author,
+  license = License("GPLv3"),
+  comment = "\nSome multiline\ncomment\n",
+)
+
+
+class TestPluginMetadata(object):
+
+  @p("protocol", range(pickle.HIGHEST_PROTOCOL + 1))
+  def test_pickle(self, protocol):
+    data = pickle.dumps(model, protocol)
+    result = pickle.loads(data)
+    assert result == model
+    assert result is not model
+    assert result.developer is result.maintainer # Shared object
+
+  @p("obj", [model, author, model.license, model.ports[0]])
+  def test_slots(self, obj):
+    assert not hasattr(obj, "__dict__")
+    with pytest.raises(AttributeError):
+      obj.something_else = 1
+
+  def test_containers_are_tuples(self):
+    assert model.classes == ("lv2:Plugin", "lv2:FilterPlugin")
+    assert isinstance(model.ports, tuple)
+    assert model.ports[0].classes == ("lv2:AudioPort", "lv2:InputPort")
+
+  def test_equality_and_hash(self):
+    other = Person("Someone", "http://some.where", "some@one.net")
+    assert other == author
+    assert not other != author
+    assert hash(other) == hash(author)
+    assert Person("Someone") != author
+    assert License("Someone") != Person("Someone")
+
+  def test_channels(self):
+    assert model.channels == 1
+    assert [port.is_input for port in model.ports] == [True, False]
+
+  def test_repr(self):
+    assert repr(model.license) == "License(uri='GPLv3')"
+    assert repr(Person("A")) == \
+           "Person(name='A', homepage=None, email=None)"
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Created on Mon 2026-10-19 08:54:55 BRT
+# License is GPLv3, see COPYING.txt for more details.
+# @author: Danilo de Jesus da Silva Bellini
+
+import pytest
+p = pytest.mark.parametrize
+
+from audiolazy import Stream, sHz
+from ..core import run_source
+from ..trace import trace, TraceError
+from ..codegen import polyphase, ns2kernel, multirate_accumulators
+from ..multirate import rate_values, lowpass_taps, Multirate, multirate_taps
+
+
+def test_rate_values():
+  values = rate_values(8000)
+  assert values["rate"] == 8000
+  assert (values["s"], values["Hz"]) == sHz(8000)
+  assert values["ms"] == pytest.approx(1e-3 * values["s"])
+  assert values["kHz"] == pytest.approx(1e3 * values["Hz"])
+
+
+@p("factor", [2, 3, 4, 8])
+def test_lowpass_taps(factor):
+  taps = lowpass_taps(factor)
+  assert len(taps) == factor * multirate_taps
+  assert sum(taps) == pytest.approx(1.)
+  assert taps == pytest.approx(taps[::-1]) # Linear phase
+
+
+class TestMultirate(object):
+
+  @p("factor", [1, 0, 2.5, "2"])
+  def test_invalid_factor(self, factor):
+    with pytest.raises(ValueError):
+      Multirate(lambda sig: sig, factor)
+
+  def test_naive_implementation(self):
+    process = Multirate(lambda sig: sig + 1, 2, taps=[1.])
+    assert process.interpolator_taps == [2.]
+    assert list(process(Stream([3, 4, 5, 6, 7])).take(6)) == \
+           [8., 0., 12., 0., 16., 0.]
+
+  def test_filters(self):
+    process = Multirate(lambda sig: sig, 3, taps=[.5, .5])
+    data = [1., 2., 4., 8., 16., 32.]
+    # Decimated: [.5, 6.], interpolated with [1.5, 1.5]
+    assert list(process(Stream(data)).take(6)) == \
+           pytest.approx([.75, .75, 0., 9., 9., 0.])
+
+  def test_nested_trace(self):
+    inner = Multirate(lambda sig: sig, 2)
+    with pytest.raises(TraceError):
+      trace(lambda sig: inner(sig) * 2)
+
+
+class TestDecimated(object):
+
+  src = "\n".join([
+    "class Metadata:",
+    "  name = 'Multirate'",
+    "  uri = 'http://lz2lv2.test/multirate'",
+    "with decimated(4) as stage:",
+    "  inner_rate, inner_Hz = rate, Hz",
+    "  with decimated(2):",
+    "    nested_rate = rate",
+    "  smooth = lowpass(20 * Hz)",
+    "process = stage(smooth)",
+  ])
+
+  def test_rate_values(self):
+    ns = run_source(self.src, "multirate.py", rate=44100)
+    assert ns["inner_rate"] == 11025
+    assert ns["inner_Hz"] == sHz(11025)[1]
+    assert ns["nested_rate"] == 11025 / 2
+    assert (ns["rate"], ns["Hz"]) == (44100, sHz(44100)[1]) # Restored
+
+  def test_kernel(self):
+    ns = run_source(self.src, "multirate.py", rate=44100)
+    assert isinstance(ns["process"], Multirate)
+    assert ns["process"].factor == 4
+    name, data = ns2kernel(ns)
+    assert name == "multirate"
+    factor, dec_taps, int_taps, graph, output = data
+    assert (factor, dec_taps, int_taps) == (4, ns["process"].taps,
+                                            ns["process"].interpolator_taps)
+    assert output.op == "filter"
+    with pytest.raises(ValueError):
+      ns2kernel(ns, engine="dfi")
+
+
+@p(("size", "factor"), [(32, 4), (7, 2), (5, 8)])
+def test_polyphase(size, factor):
+  taps = list(range(1, size + 1))
+  phases = polyphase(taps, factor)
+  assert len(phases) == factor
+  assert all(len(phase) == len(phases[0]) for phase in phases)
+  assert len(phases[0]) % multirate_accumulators == 0
+  assert sorted(tap for phase in phases for tap in phase if tap) == taps
+  assert [tap for tap in phases[1] if tap] == taps[1::factor]
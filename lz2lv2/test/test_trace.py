@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Created on Mon 2026-10-19 08:39:33 BRT
+# License is GPLv3, see COPYING.txt for more details.
+# @author: Danilo de Jesus da Silva Bellini
+
+import pytest
+p = pytest.mark.parametrize
+
+from ..core import run_source
+from ..trace import trace, TraceError, Graph, LinearFilter
+
+
+def traced(src):
+  """ Trace the ``process`` defined by the given source. """
+  return trace(run_source("process = " + src, "traced.py")["process"])
+
+
+def ops(graph, output):
+  return [node.op for node in graph.reachable(output)]
+
+
+class TestGraph(object):
+
+  def test_cse(self):
+    graph = Graph()
+    x = graph.input
+    a = graph.apply("mul", x, graph.const(2))
+    b = graph.apply("mul", x, graph.const(2.))
+    assert a is b
+    assert graph.apply("add", a, b) is graph.apply("add", a, b)
+    assert graph.apply("call", x, value="sin") is \
+           graph.apply("call", x, value="sin")
+    assert graph.apply("call", x, value="sin") is not \
+           graph.apply("call", x, value="cos")
+
+  def test_reachable(self):
+    graph = Graph()
+    unused = graph.apply("call", graph.input, value="exp")
+    output = graph.apply("neg", graph.input)
+    assert graph.reachable(output) == [graph.input, output]
+    assert unused not in graph.reachable(output)
+
+
+class TestTrace(object):
+
+  def test_identity(self):
+    graph, output = traced("lambda sig: sig")
+    assert output is graph.input
+
+  @p(("src", "value"), [
+    ("lambda sig: 2 * 3 + 1", 7.),
+    ("lambda sig: sig * 0", 0.),
+    ("lambda sig: (1 + sig) - sig", None), # Not folded: not a constant
+    ("lambda sig: abs(-3)", 3.),
+  ])
+  def test_constant_folding(self, src, value):
+    graph, output = traced(src)
+    if value is None:
+      assert output.op != "const"
+    else:
+      assert output.op == "const"
+      assert output.value == value
+
+  @p("src", ["lambda sig: (sig * 0).map(log)",
+             "lambda sig: (sig * 0 - 1).map(sqrt)",
+             "lambda sig: (sig * 0 + 1e3).map(exp)"])
+  def test_math_errors_not_folded(self, src):
+    graph, output = traced(src)
+    assert ops(graph, output) == ["const", "call"]
+
+  def test_folded_subexpressions(self):
+    graph, output = traced("lambda sig: sig * (2 * pi / 4) + (1 - 1)")
+    assert ops(graph, output) == ["input", "const", "mul"]
+
+  @p("src", ["lambda sig: sig * 1", "lambda sig: 1 * sig + 0",
+             "lambda sig: (sig - 0) / 1", "lambda sig: --sig",
+             "lambda sig: +sig", "lambda sig: sig ** 1",
+             "lambda sig: ZFilter(1)(sig)"])
+  def test_identities(self, src):
+    graph, output = traced(src)
+    assert output is graph.input
+
+  def test_power_expansion(self):
+    graph, output = traced("lambda sig: sig ** 3 + sig ** 2")
+    assert ops(graph, output) == ["input", "mul", "mul", "add"]
+    graph, output = traced("lambda sig: sig ** 2.5")
+    assert output.op == "pow"
+
+  def test_thub(self):
+    graph, output = traced("lambda sig: thub(sig, 2) * 2")
+    assert ops(graph, output) == ["input", "const", "mul"]
+
+  def test_cse_in_trace(self):
+    graph, output = traced("lambda sig: sig.map(tanh) * sig.map(tanh) + "
+                           "lowpass(.1)(sig) - lowpass(.1)(sig.copy())")
+    assert ops(graph, output) == ["input", "call", "mul", "filter",
+                                  "add", "sub"]
+
+  def test_map(self):
+    graph, output = traced("lambda sig: sig.map(sin).map(lambda x: x * x)"
+                           ".map(abs)")
+    assert ops(graph, output) == ["input", "call", "mul", "call"]
+    assert [node.value for node in graph.reachable(output)
+            if node.op == "call"] == ["sin", "fabs"]
+
+  def test_map_logarithms(self):
+    graph, output = traced("lambda sig: sig.map(log10) + sig.map(log2) + "
+                           "sig.map(ln) + sig.map(log) + sig.map(log1p)")
+    assert sorted(node.value for node in graph.reachable(output)
+                  if node.op == "call") == ["log", "log10", "log1p", "log2"]
+
+  def test_filter(self):
+    graph, output = traced("lambda sig: 2 * (1 / (1 - .5 * z ** -1))(sig)")
+    const, filt = output.args
+    assert const.value == 2.
+    assert filt.op == "filter"
+    assert filt.value == ((1.,), (1., -.5))
+
+  def test_cascade(self):
+    graph, output = traced("lambda sig: (lowpass(.1) * highpass(.2))(sig)")
+    assert ops(graph, output) == ["input", "filter"] # A single ZFilter
+    graph, output = traced("lambda sig: "
+                           "CascadeFilter(lowpass(.1), highpass(.2))(sig)")
+    assert ops(graph, output) == ["input", "filter", "filter"]
+
+  def test_filter_call_restored(self):
+    call = LinearFilter.__call__
+    traced("lambda sig: lowpass(.1)(sig)")
+    assert LinearFilter.__call__ is call
+    with pytest.raises(TraceError):
+      traced("lambda sig: lowpass(.1)(sig) > 0")
+    assert LinearFilter.__call__ is call
+
+
+class TestDiagnostics(object):
+
+  @p(("src", "name"), [
+    ("lambda sig: sig > 0", ">"),
+    ("lambda sig: sig % 2", "%"),
+    ("lambda sig: sig.peek()", "Stream.peek"),
+    ("lambda sig: sig.take(2)", "Stream.take"),
+    ("lambda sig: sig.map(round)", "round"),
+    ("lambda sig: sig.map(max)", "max"),
+    ("lambda sig: sig * Stream(1, 2)", "Stream"),
+    ("lambda sig: sig * 1j", "complex"),
+    ("lambda sig: sin(sig)", "Stream.map"),
+    ("lambda sig: [el for el in sig]", "iteration"),
+    ("lambda sig: tanh(sig)", "float"),
+    ("lambda sig: sig if sig else 0", "bool"),
+    ("lambda sig: sig[0]", "indexing"),
+    ("lambda sig: lowpass(.1)(sig, zero=1.)", "memory/zero"),
+    ("lambda sig: (1 + z)(sig)", "Non-causal"),
+    ("lambda sig: 'text'", "str"),
+    ("lambda sig: sig.map(lambda el: el > 0)", "Stream.map(<lambda>)"),
+  ])
+  def test_unsupported(self, src, name):
+    with pytest.raises(TraceError) as exc:
+      traced(src)
+    assert name in str(exc.value)
@@ -0,0 +1,335 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Created on Mon 2026-10-19 08:39:10 BRT
+# License is GPLv3, see COPYING.txt for more details.
+# @author: Danilo de Jesus da Silva Bellini
+"""
+lz2lv2 symbolic tracing of AudioLazy Stream expressions.
+
+The ``process`` is called with a ``Symbol`` instead of a Stream, recording
+every operation in an expression ``Graph`` whose nodes are created with
+common subexpression elimination (hash consing) and constant folding.
+"""
+
+from __future__ import division
+
+from contextlib import contextmanager
+from numbers import Number
+from audiolazy import LinearFilter, lazy_math
+import logging, math, operator, types
+
+
+logger = logging.getLogger(__name__)
+
+
+class TraceError(TypeError):
+  """ Unsupported construct found when tracing a ``process``. """
+
+
+# C functions from the known (math) functions, the ones this Python has
+# (e.g. there's no math.log2 in Python 2)
+c_functions = dict((getattr(math, name), name) for name in [
+  "sin", "cos", "tan", "asin", "acos", "atan",
+  "sinh", "cosh", "tanh", "asinh", "acosh", "atanh",
+  "exp", "expm1", "log", "log10", "log2", "log1p", "sqrt",
+  "fabs", "floor", "ceil", "trunc", "erf", "erfc",
+] if hasattr(math, name))
+c_functions[abs] = "fabs"
+
+# The AudioLazy logarithms aren't just the math ones with elementwise
+# wrappers, as they handle zero and complex results, so they're mapped
+# directly (the wrapped function as well, as it's what ``map`` sees), and
+# the C functions already give -inf for zero
+for name, c_name in [("log", "log"), ("ln", "log"), ("log10", "log10"),
+                     ("log2", "log2"), ("log1p", "log1p")]:
+  func = getattr(lazy_math, name)
+  c_functions[func] = c_functions[getattr(func, "__wrapped__", func)] = c_name
+del name, c_name, func
+
+# Constant folding for the operators (the "call" operator is done apart)
+folders = {
+  "add": operator.add,
+  "sub": operator.sub,
+  "mul": operator.mul,
+  "div": operator.truediv,
+  "pow": operator.pow,
+  "neg": operator.neg,
+}
+
+# Symbols for the diagnostics
+op_symbols = {"add": "+", "sub": "-", "mul": "*", "div": "/", "pow": "**"}
+
+
+class Node(object):
+  """
+  An expression graph node. The ``value`` is the constant value for the
+  ``"const"`` operator, the C function name for ``"call"``, the ``(b, a)``
+  normalized coefficients pair of tuples for ``"filter"``, and None for the
+  other operators (``"input"``, ``"neg"`` and the binary ones).
+  """
+  __slots__ = ("op", "args", "value", "index")
+
+  def __init__(self, op, args, value, index):
+    self.op = op
+    self.args = args
+    self.value = value
+    self.index = index
+
+  def __repr__(self):
+    return "Node({!r}, {!r}, {!r}, {})".format(
+      self.op, tuple(arg.index for arg in self.args), self.value, self.index
+    )
+
+
+class Graph(object):
+  """
+  Expression graph, with the nodes in a topological order.
+  """
+  def __init__(self):
+    self.nodes = []
+    self.cache = {}
+    self.input = self.node("input")
+
+  def node(self, op, *args, **kwargs):
+    """
+    Get the node for the given operator, arguments (nodes) and ``value``
+    keyword argument, creating it only when there's no such node.
+    """
+    value = kwargs.pop("value", None)
+    key = op, tuple(arg.index for arg in args), value
+    if key not in self.cache:
+      self.cache[key] = Node(op, args, value, len(self.nodes))
+      self.nodes.append(self.cache[key])
+    return self.cache[key]
+
+  def const(self, value):
+    if isinstance(value, complex) or not isinstance(value, Number):
+      raise TraceError("Unsupported constant {!r}".format(value))
+    return self.node("const", value=float(value))
+
+  def apply(self, op, *args, **kwargs):
+    """
+    Like ``node``, but with constant folding and some algebraic
+    simplifications.
+    """
+    value = kwargs.get("value", None)
+    consts = [arg.value if arg.op == "const" else None for arg in args]
+    if all(const is not None for const in consts):
+      # Not folded when Python raises (e.g. the math domain errors), as C
+      # gives the IEEE 754 infinities and NaN there
+      func = folders.get(op) or (getattr(math, value, None)
+                                 if op == "call" else None)
+      if func:
+        try:
+          return self.const(func(*consts))
+        except (ArithmeticError, ValueError):
+          pass
+
+    if op in ["add", "sub"]:
+      if consts[1] == 0:
+        return args[0]
+      if consts[0] == 0:
+        return args[1] if op == "add" else self.apply("neg", args[1])
+    elif op == "mul":
+      for const, other in [(consts[0], args[1]), (consts[1], args[0])]:
+        if const == 1:
+          return other
+        if const == -1:
+          return self.apply("neg", other)
+        if const == 0:
+          return self.const(0.)
+    elif op == "div" and consts[1] == 1:
+      return args[0]
+    elif op == "pow" and consts[1] is not None and consts[1] % 1 == 0 \
+                     and -1 <= consts[1] <= 4:
+      if consts[1] == -1:
+        return self.apply("div", self.const(1.), args[0])
+      result = self.const(1.)
+      for unused in range(int(consts[1])):
+        result = self.apply("mul", result, args[0])
+      return result
+    elif op == "neg" and args[0].op == "neg":
+      return args[0].args[0]
+    elif op == "filter":
+      b, a = value
+      if a == (1.,) and len(b) == 1: # Just a gain
+        return self.apply("mul", args[0], self.const(b[0]))
+
+    return self.node(op, *args, **kwargs)
+
+  def reachable(self, output):
+    """ List of nodes needed to compute the output, in topological order. """
+    needed = set([output.index])
+    for node in reversed(self.nodes[:output.index + 1]):
+      if node.index in needed:
+        needed.update(arg.index for arg in node.args)
+    return [node for node in self.nodes if node.index in needed]
+
+
+def unsupported(name):
+  """ Method for the Symbol class that always raises a ``TraceError``. """
+  def method(self, *args, **kwargs):
+    raise TraceError("Unsupported operator {} in a traced process"
+                     .format(name))
+  return method
+
+
+class Symbol(object):
+  """
+  Symbolic signal, i.e., a Stream replacement that records the operations
+  on it in a ``Graph``. It's not an iterable, so ``thub`` keeps it as is
+  (symbols can be used several times).
+  """
+  __slots__ = ("graph", "node")
+
+  def __init__(self, graph, node):
+    self.graph = graph
+    self.node = node
+
+  def operand(self, other, description):
+    """ Node from a Symbol or a number in the same graph. """
+    if isinstance(other, Symbol):
+      if other.graph is not self.graph:
+        raise TraceError("Mixing symbols from distinct traces")
+      return other.node
+    if isinstance(other, Number) and not isinstance(other, complex):
+      return self.graph.const(other)
+    raise TraceError("Unsupported {} of type {} in a traced process"
+                     .format(description, type(other).__name__))
+
+  def apply(self, op, *args, **kwargs):
+    return Symbol(self.graph, self.graph.apply(op, *args, **kwargs))
+
+  def binary(op, reflected=False):
+    def method(self, other):
+      other = self.operand(other, "operand for " + op_symbols[op])
+      if reflected:
+        return self.apply(op, other, self.node)
+      return self.apply(op, self.node, other)
+    return method
+
+  __add__ = binary("add")
+  __sub__ = binary("sub")
+  __mul__ = binary("mul")
+  __truediv__ = __div__ = binary("div")
+  __pow__ = binary("pow")
+  __radd__ = binary("add", reflected=True)
+  __rsub__ = binary("sub", reflected=True)
+  __rmul__ = binary("mul", reflected=True)
+  __rtruediv__ = __rdiv__ = binary("div", reflected=True)
+  __rpow__ = binary("pow", reflected=True)
+  del binary
+
+  def __neg__(self):
+    return self.apply("neg", self.node)
+
+  def __pos__(self):
+    return self
+
+  def __abs__(self):
+    return self.apply("call", self.node, value="fabs")
+
+  def map(self, func):
+    """ Apply a known (math) function, or trace a Python function. """
+    func = getattr(func, "__wrapped__", func) # AudioLazy elementwise
+    if func in c_functions:
+      return self.apply("call", self.node, value=c_functions[func])
+    if isinstance(func, types.FunctionType):
+      try:
+        result = func(self)
+      except TraceError as exc:
+        raise TraceError("In Stream.map({}): {}".format(func.__name__, exc))
+      if not isinstance(result, Symbol):
+        result = Symbol(self.graph, self.operand(result, "map result"))
+      return result
+    raise TraceError("Unsupported function {} in map"
+                     .format(getattr(func, "__name__", repr(func))))
+
+  def copy(self):
+    return self
+
+  def __float__(self):
+    raise TraceError("Unsupported operator float in a traced process "
+                     "(math functions should be applied with Stream.map)")
+
+  def __getattr__(self, name):
+    if name.startswith("_"):
+      raise AttributeError(name)
+    raise TraceError("Unsupported operator Stream.{} in a traced process"
+                     .format(name))
+
+for name, symbol in [("lt", "<"), ("le", "<="), ("gt", ">"), ("ge", ">="),
+                     ("eq", "=="), ("ne", "!="), ("mod", "%"), ("rmod", "%"),
+                     ("floordiv", "//"), ("rfloordiv", "//"), ("and", "&"),
+                     ("or", "|"), ("xor", "^"), ("invert", "~"),
+                     ("lshift", "<<"), ("rshift", ">>"),
+                     ("getitem", "indexing/iteration"),
+                     ("bool", "bool"), ("nonzero", "bool"), ("int", "int"),
+                     ("index", "int"), ("round", "round")]:
+  setattr(Symbol, "__{}__".format(name), unsupported(symbol))
+del name, symbol
+
+
+def filter_call(filt, seq, memory=None, zero=0., tolerance=None):
+  """
+  ``LinearFilter.__call__`` replacement for a symbolic input, simplifying
+  the filter (see ``codegen.simplify_filter``) unless the ``tolerance`` is
+  None.
+  """
+  if memory is not None or zero != 0:
+    raise TraceError("Unsupported filter call arguments (memory/zero) in a "
+                     "traced process")
+  from .codegen import linear_coeffs, simplify_filter, multiplies
+  try:
+    b, a = linear_coeffs(filt)
+  except (ValueError, TypeError, ZeroDivisionError) as exc:
+    raise TraceError("Unsupported filter {!r}: {}".format(filt, exc))
+  before = multiplies(b, a)
+  if tolerance is not None:
+    b, a = simplify_filter(b, a, tolerance=tolerance)
+  result = seq.apply("filter", seq.node, value=(tuple(b), tuple(a)))
+  if result.node.op == "filter":
+    logger.info("Traced filter f%d: %d multiplies per sample (%d before "
+                "simplifying)", result.node.index, multiplies(b, a), before)
+  return result
+
+
+@contextmanager
+def symbolic_filters(tolerance=None):
+  """
+  Context manager that makes every linear filter be applied symbolically
+  when its input is a ``Symbol``, with the given simplification
+  ``tolerance`` (see ``filter_call``).
+  """
+  original_call = LinearFilter.__call__
+  def call(self, seq, *args, **kwargs):
+    if isinstance(seq, Symbol):
+      return filter_call(self, seq, *args, tolerance=tolerance, **kwargs)
+    return original_call(self, seq, *args, **kwargs)
+  LinearFilter.__call__ = call
+  try:
+    yield
+  finally:
+    LinearFilter.__call__ = original_call
+
+
+def trace(process, tolerance=None):
+  """
+  Trace the given process (a callable that gets and returns a Stream). The
+  linear filters are simplified when a ``tolerance`` is given (see
+  ``filter_call``).
+
+  Returns
+  -------
+  A pair with the expression ``Graph`` and its output node.
+  """
+  graph = Graph()
+  with symbolic_filters(tolerance):
+    result = process(Symbol(graph, graph.input))
+  if isinstance(result, Symbol):
+    return graph, result.node
+  try:
+    return graph, graph.const(result)
+  except TraceError:
+    raise TraceError("Unsupported process output of type {}"
+                     .format(type(result).__name__))